@@ -0,0 +1,81 @@
+"""
+Persistent cache for Chat Completions responses.
+
+Most prompts the agent sends are fully determined by their inputs (fixed
+CONSORT item descriptions, the LaTeX-formatting prompt for a given draft),
+so reruns and retries after a failure would otherwise pay for identical
+requests again.  Responses are keyed by a SHA-256 hash of the request
+parameters and stored in SQLite, fronted by a bounded in-memory LRU of
+recent entries.  Methods block on disk I/O, so async callers run them with
+``asyncio.to_thread``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+MEMORY_ENTRIES = 1024  # completions kept in memory (the rest stay on disk)
+
+
+class ChatCache:
+    """Two-level (memory → SQLite) cache of completion text by request hash."""
+
+    def __init__(self, path: Path, memory_entries: int = MEMORY_ENTRIES) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chat_cache (key TEXT PRIMARY KEY, content TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._memory_entries = memory_entries
+        self._lock = threading.Lock()
+        logger.info("Chat cache at %s", path)
+
+    @staticmethod
+    def make_key(request: dict[str, Any]) -> str:
+        """Hash the Chat Completions request parameters into a cache key."""
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached content for *key*, or None on a miss."""
+        with self._lock:
+            content = self._memory.get(key)
+            if content is not None:
+                self._memory.move_to_end(key)
+                return content
+            row = self._conn.execute(
+                "SELECT content FROM chat_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[0])
+        return row[0]
+
+    def put(self, key: str, content: str) -> None:
+        """Store *content* under *key* in memory and on disk."""
+        with self._lock:
+            self._remember(key, content)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chat_cache (key, content) VALUES (?, ?)",
+                (key, content),
+            )
+            self._conn.commit()
+
+    def _remember(self, key: str, content: str) -> None:
+        """Add to the in-memory LRU, evicting the oldest entry when full."""
+        self._memory[key] = content
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
@@ -3,23 +3,33 @@ LangGraph StateGraph definition for the CONSORT deep-research agent.
 
 Graph topology:
 
-  plan_research → retrieve → evaluate ─┬─ sufficient → synthesize ─┬─ (more items) → plan_research
-                                        ├─ need_more → retrieve     └─ (all done)  → generate_latex
+  research_items → generate_latex → END
+
+``research_items`` runs one research pipeline per CONSORT item, all items
+concurrently (bounded by ``settings.item_concurrency``):
+
+  plan_research → retrieve → evaluate ─┬─ sufficient → synthesize
+                                        ├─ need_more → retrieve
                                         └─ need_web  → web_search → evaluate
 
-The graph processes each CONSORT item iteratively, performing multi-hop
-retrieval with a max of 3 hops per item before forcing synthesis.
+Items are independent until LaTeX generation, so researching them in
+parallel collapses wall time from the sum of the per-item pipelines to
+roughly the slowest one.  Each item performs multi-hop retrieval with a
+max of 3 hops before forcing synthesis.
 """
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
 from pathlib import Path
+from typing import Annotated, Any, get_origin, get_type_hints
 
+import msgspec
 from langgraph.graph import END, StateGraph
 
-from agent.state import AgentState, ConsortItem
+from config import get_settings
+from agent.state import AgentState, ConsortItem, ItemState
 from agent.nodes import (
     plan_research,
     retrieve,
@@ -34,7 +44,7 @@ logger = logging.getLogger(__name__)
 
 # ── Conditional edge routers ────────────────────────────────────────────
 
-def _route_after_evaluate(state: AgentState) -> str:
+def _route_after_evaluate(state: ItemState) -> str:
     """Route based on the evaluation verdict."""
     verdict = state.get("evaluation_result", "sufficient")
     if verdict == "need_more":
@@ -45,14 +55,94 @@ def _route_after_evaluate(state: AgentState) -> str:
         return "synthesize"
 
 
-def _route_after_synthesize(state: AgentState) -> str:
-    """Route based on whether more CONSORT items remain."""
-    idx = state["current_item_index"]
-    total = len(state["consort_items"])
-    if idx < total:
-        return "plan_research"
-    else:
-        return "generate_latex"
+# ── Per-item research pipeline ──────────────────────────────────────────
+
+# Fields whose node updates are merged rather than replaced (mirrors how
+# LangGraph applies Annotated reducers to AgentState)
+_ITEM_REDUCERS = {
+    name: hint.__metadata__[0]
+    for name, hint in get_type_hints(ItemState, include_extras=True).items()
+    if get_origin(hint) is Annotated
+}
+
+
+def _apply(state: ItemState, update: dict[str, Any]) -> None:
+    for key, value in update.items():
+        reducer = _ITEM_REDUCERS.get(key)
+        state[key] = reducer(state[key], value) if reducer else value
+
+
+def _initial_item_state(item: ConsortItem) -> ItemState:
+    return ItemState(
+        item=item,
+        research_queries=[],
+        retrieved_chunks=[],
+        retrieved_chunk_hashes=set(),
+        unfamiliar_terms=[],
+        web_search_results={},
+        evaluation_result="",
+        hop_count=0,
+        draft="",
+    )
+
+
+async def process_item(item: ConsortItem, semaphore: asyncio.Semaphore) -> ItemState:
+    """
+    Research a single CONSORT item and return its final substate.
+
+    Walks plan_research → retrieve → evaluate (looping through retrieve /
+    web_search as the verdict dictates) → synthesize.
+    """
+    state = _initial_item_state(item)
+    async with semaphore:
+        _apply(state, await plan_research(state))
+        _apply(state, await retrieve(state))
+        _apply(state, await evaluate(state))
+        while (step := _route_after_evaluate(state)) != "synthesize":
+            if step == "retrieve":
+                _apply(state, await retrieve(state))
+            else:
+                _apply(state, await web_search(state))
+            _apply(state, await evaluate(state))
+        _apply(state, await synthesize(state))
+    return state
+
+
+async def research_items(state: AgentState) -> dict[str, Any]:
+    """
+    Run the research pipeline for every CONSORT item concurrently.
+
+    Items that already have a draft (checkpointed by an earlier, crashed
+    run) are skipped.
+    """
+    done = state.get("section_drafts", {})
+    items = [item for item in state["consort_items"] if not done.get(item.id)]
+    if done:
+        logger.info("Resuming: %d items already drafted", len(done))
+    semaphore = asyncio.Semaphore(get_settings().item_concurrency)
+    results = await asyncio.gather(
+        *[process_item(item, semaphore) for item in items],
+        return_exceptions=True,
+    )
+
+    # Only new entries are returned; AgentState's reducers merge them in
+    item_states: dict[str, ItemState] = {}
+    drafts: dict[str, str] = {}
+    web_defs: dict[str, str] = {}
+    for item, result in zip(items, results):
+        if isinstance(result, BaseException):
+            logger.error("Research failed for item %s: %s", item.id, result)
+            continue
+        item_states[item.id] = result
+        drafts[item.id] = result["draft"]
+        web_defs.update(result["web_search_results"])
+
+    logger.info("Researched %d/%d CONSORT items", len(item_states), len(items))
+    return {
+        "item_states": item_states,
+        "section_drafts": drafts,
+        "web_search_results": web_defs,
+    }
 
 
 # ── Graph construction ──────────────────────────────────────────────────
@@ -67,45 +157,14 @@ def build_graph() -> StateGraph:
     graph = StateGraph(AgentState)
 
     # Add nodes
-    graph.add_node("plan_research", plan_research)
-    graph.add_node("retrieve", retrieve)
-    graph.add_node("evaluate", evaluate)
-    graph.add_node("web_search", web_search)
-    graph.add_node("synthesize", synthesize)
+    graph.add_node("research_items", research_items)
     graph.add_node("generate_latex", generate_latex)
 
     # Set entry point
-    graph.set_entry_point("plan_research")
+    graph.set_entry_point("research_items")
 
     # Edges
-    graph.add_edge("plan_research", "retrieve")
-    graph.add_edge("retrieve", "evaluate")
-
-    # Conditional: after evaluate
-    graph.add_conditional_edges(
-        "evaluate",
-        _route_after_evaluate,
-        {
-            "retrieve": "retrieve",
-            "web_search": "web_search",
-            "synthesize": "synthesize",
-        },
-    )
-
-    # web_search always loops back to evaluate
-    graph.add_edge("web_search", "evaluate")
-
-    # Conditional: after synthesize
-    graph.add_conditional_edges(
-        "synthesize",
-        _route_after_synthesize,
-        {
-            "plan_research": "plan_research",
-            "generate_latex": "generate_latex",
-        },
-    )
-
-    # generate_latex → END
+    graph.add_edge("research_items", "generate_latex")
     graph.add_edge("generate_latex", END)
 
     return graph
@@ -113,36 +172,46 @@ def build_graph() -> StateGraph:
 
 def load_consort_items(consort_json_path: Path) -> list[ConsortItem]:
     """Load CONSORT checklist items from the JSON file."""
-    with open(consort_json_path) as f:
-        data = json.load(f)
-
-    items: list[ConsortItem] = []
-    for raw in data["items"]:
-        items.append(
-            ConsortItem(
-                id=raw["id"],
-                section=raw["section"],
-                topic=raw["topic"],
-                description=raw["description"],
-                group=raw.get("group", ""),
-            )
-        )
-    return items
+    data = msgspec.json.decode(Path(consort_json_path).read_bytes(), type=dict)
+    # Unknown keys (e.g. reported_page) are ignored; missing "group" defaults to ""
+    return msgspec.convert(data["items"], type=list[ConsortItem])
+
+
+def _load_draft_checkpoints(drafts_dir: Path | None) -> dict[str, str]:
+    """Read drafts checkpointed by synthesize (empty if none / disabled)."""
+    if drafts_dir is None or not drafts_dir.is_dir():
+        return {}
+    return {p.stem: p.read_text(encoding="utf-8") for p in drafts_dir.glob("*.md")}
+
+
+def clear_draft_checkpoints() -> None:
+    """Remove checkpointed drafts once a run has produced its report."""
+    drafts_dir = get_settings().drafts_dir
+    if drafts_dir is None or not drafts_dir.is_dir():
+        return
+    for p in drafts_dir.glob("*.md"):
+        p.unlink(missing_ok=True)
 
 
 def create_initial_state(consort_json_path: Path) -> AgentState:
-    """Create the initial agent state from the CONSORT checklist."""
+    """
+    Create the initial agent state from the CONSORT checklist.
+
+    Drafts left behind by an interrupted run are pre-loaded so their items
+    are not researched again.
+    """
     items = load_consort_items(consort_json_path)
+    item_ids = {item.id for item in items}
+    drafts = {
+        item_id: draft
+        for item_id, draft in _load_draft_checkpoints(get_settings().drafts_dir).items()
+        if item_id in item_ids
+    }
     return AgentState(
         consort_items=items,
-        current_item_index=0,
-        research_queries=[],
-        retrieved_chunks=[],
-        unfamiliar_terms=[],
+        item_states={},
         web_search_results={},
-        evaluation_result="",
-        hop_count=0,
-        section_drafts={},
+        section_drafts=drafts,
         latex_sections={},
         final_latex="",
     )
@@ -0,0 +1,31 @@
+"""
+Shared async HTTP transport.
+
+All async HTTP traffic from the agent (currently the OpenAI client) goes
+through one ``httpx.AsyncClient`` with HTTP/2 enabled, so the concurrent
+completions from the per-item fan-out are multiplexed over a handful of
+pooled TLS connections instead of each opening its own.
+"""
+
+from __future__ import annotations
+
+import functools
+
+import httpx
+
+
+@functools.cache
+def get_shared_client() -> httpx.AsyncClient:
+    """Return the process-wide async HTTP client (created on first use)."""
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    )
+
+
+async def aclose_shared_client() -> None:
+    """Close the shared client, if it was ever created."""
+    if get_shared_client.cache_info().currsize:
+        await get_shared_client().aclose()
+        get_shared_client.cache_clear()
@@ -1,7 +1,12 @@
 """
 LangGraph node functions for the CONSORT deep-research agent.
 
-Every node is a pure function:  State → partial State update.
+Every node is an async function:  State → partial State update.
+The research nodes (plan_research … synthesize) operate on the ItemState
+of a single CONSORT item; generate_latex operates on the full AgentState.
+LLM calls go through ``_achat`` (AsyncOpenAI) so independent requests can
+be overlapped with ``asyncio.gather``; a shared semaphore caps how many are
+in flight at once to stay within the account's rate limits.
 
 Uses the OpenAI Chat Completions API with GPT-5.2:
   POST /v1/chat/completions
@@ -15,57 +20,61 @@ API reference: https://platform.openai.com/docs/api-reference/chat/create
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
 import json
 import logging
-from typing import Any
+from typing import Any, AsyncIterator
 
-from openai import OpenAI
-
-from agent.state import AgentState
-from config import Settings, get_settings
+from agent.chat_cache import ChatCache
+from agent.state import AgentState, ItemState
+from config import get_async_openai, get_settings, get_you_client
 from retrieval.client import QdrantRetriever
-from search.you_client import YouSearchClient
 from latex.generator import sections_to_latex
 
 logger = logging.getLogger(__name__)
 
-# ── Shared singletons (initialised lazily) ──────────────────────────────
-
-_settings: Settings | None = None
-_openai: OpenAI | None = None
-_retriever: QdrantRetriever | None = None
-_you_client: YouSearchClient | None = None
+# ── Shared singletons (initialised lazily, once) ────────────────────────
 
+@functools.cache
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    return asyncio.Semaphore(get_settings().llm_max_concurrency)
 
-def _get_settings() -> Settings:
-    global _settings
-    if _settings is None:
-        _settings = get_settings()
-    return _settings
 
-
-def _get_openai() -> OpenAI:
-    global _openai
-    if _openai is None:
-        _openai = OpenAI(api_key=_get_settings().openai_api_key)
-    return _openai
+@functools.cache
+def _get_chat_cache() -> ChatCache | None:
+    settings = get_settings()
+    if not settings.chat_cache_enabled:
+        return None
+    return ChatCache(settings.cache_dir / "chat.sqlite")
 
 
+@functools.cache
 def _get_retriever() -> QdrantRetriever:
-    global _retriever
-    if _retriever is None:
-        _retriever = QdrantRetriever(_get_settings())
-    return _retriever
+    return QdrantRetriever(get_settings())
 
 
-def _get_you_client() -> YouSearchClient:
-    global _you_client
-    if _you_client is None:
-        _you_client = YouSearchClient(_get_settings())
-    return _you_client
+def _chat_kwargs(
+    messages: list[dict[str, str]],
+    max_completion_tokens: int | None,
+    reasoning_effort: str | None,
+    response_format: dict | None,
+) -> dict[str, Any]:
+    """Build the Chat Completions request parameters (also the cache key)."""
+    settings = get_settings()
+    kwargs: dict[str, Any] = {
+        "model": settings.llm_model,
+        "messages": messages,
+        "max_completion_tokens": max_completion_tokens or settings.llm_max_completion_tokens,
+        "reasoning_effort": reasoning_effort or settings.llm_reasoning_effort,
+    }
+    if response_format is not None:
+        kwargs["response_format"] = response_format
+    return kwargs
 
 
-def _chat(
+async def _achat(
     messages: list[dict[str, str]],
     *,
     max_completion_tokens: int | None = None,
@@ -79,50 +88,147 @@ def _chat(
       https://platform.openai.com/docs/api-reference/chat/create
 
     Messages use "developer" role for system-level instructions
-    (not the legacy "system" role).
-    """
-    settings = _get_settings()
-    client = _get_openai()
+    (not the legacy "system" role).  At most ``settings.llm_max_concurrency``
+    calls are in flight at any time.
 
-    kwargs: dict[str, Any] = {
-        "model": settings.llm_model,
-        "messages": messages,
-        "max_completion_tokens": max_completion_tokens or settings.llm_max_completion_tokens,
-        "reasoning_effort": reasoning_effort or settings.llm_reasoning_effort,
-    }
-    if response_format is not None:
-        kwargs["response_format"] = response_format
+    Identical requests are answered from the chat cache without an API
+    round-trip.
+    """
+    client = get_async_openai()
+    kwargs = _chat_kwargs(messages, max_completion_tokens, reasoning_effort, response_format)
+
+    cache = _get_chat_cache()
+    key = ChatCache.make_key(kwargs) if cache is not None else ""
+    cached = await asyncio.to_thread(cache.get, key) if cache is not None else None
+    if cached is not None:
+        return cached
+
+    async with _get_llm_semaphore():
+        completion = await client.chat.completions.create(**kwargs)
+    message = completion.choices[0].message
+    if getattr(message, "refusal", None):
+        # Structured-output refusals carry no content; callers fall back
+        logger.warning("Model refused the request: %s", message.refusal)
+        return ""
+    content = (message.content or "").strip()
+    if cache is not None and content:
+        await asyncio.to_thread(cache.put, key, content)
+    return content
+
+
+async def _achat_stream(
+    messages: list[dict[str, str]],
+    *,
+    max_completion_tokens: int | None = None,
+    reasoning_effort: str | None = None,
+) -> AsyncIterator[str]:
+    """
+    Streaming variant of _achat: yields content deltas as they arrive.
 
-    completion = client.chat.completions.create(**kwargs)
-    content = completion.choices[0].message.content or ""
-    return content.strip()
+    Shares _achat's cache (a hit is yielded as a single piece) and its
+    concurrency limit, which is held until the stream is exhausted.
+    """
+    client = get_async_openai()
+    kwargs = _chat_kwargs(messages, max_completion_tokens, reasoning_effort, None)
+
+    cache = _get_chat_cache()
+    key = ChatCache.make_key(kwargs) if cache is not None else ""
+    cached = await asyncio.to_thread(cache.get, key) if cache is not None else None
+    if cached is not None:
+        yield cached
+        return
+
+    parts: list[str] = []
+    async with _get_llm_semaphore():
+        stream = await client.chat.completions.create(**kwargs, stream=True)
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            if delta:
+                parts.append(delta)
+                yield delta
+
+    content = "".join(parts).strip()
+    if cache is not None and content:
+        await asyncio.to_thread(cache.put, key, content)
+
+
+# ── Structured-output schemas ───────────────────────────────────────────
+# Passed as response_format so the model is constrained to valid JSON of
+# the expected shape – a malformed reply can no longer waste a call.
+
+QUERIES_SCHEMA: dict[str, Any] = {
+    "name": "queries",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "queries": {
+                "type": "array",
+                "items": {"type": "string"},
+                "minItems": 1,
+                "maxItems": 5,
+            },
+        },
+        "required": ["queries"],
+        "additionalProperties": False,
+    },
+}
+
+EVALUATION_SCHEMA: dict[str, Any] = {
+    "name": "evaluation",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "verdict": {"type": "string", "enum": ["sufficient", "need_more", "need_web"]},
+            "details": {"type": "string"},
+            "unfamiliar_terms": {"type": "array", "items": {"type": "string"}},
+            "follow_up_queries": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["verdict", "details", "unfamiliar_terms", "follow_up_queries"],
+        "additionalProperties": False,
+    },
+}
+
+
+def _parse_structured(raw: str, what: str) -> dict[str, Any] | None:
+    """Decode a structured-output reply, or None if it is empty or not JSON."""
+    if not raw:
+        logger.warning("Empty %s reply; using the default", what)
+        return None
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        logger.warning("Failed to parse %s JSON; using the default", what)
+        return None
 
 
 # ═══════════════════════════════════════════════════════════════════════
 # NODE 1: plan_research
 # ═══════════════════════════════════════════════════════════════════════
 
-def plan_research(state: AgentState) -> dict[str, Any]:
+async def plan_research(state: ItemState) -> dict[str, Any]:
     """
-    Decompose the current CONSORT item into 2-5 targeted retrieval queries.
+    Decompose the CONSORT item into 2-5 targeted retrieval queries.
 
     The LLM generates queries that will be run against the Qdrant vector
     store to gather evidence for this specific checklist item.
     """
-    idx = state["current_item_index"]
-    item = state["consort_items"][idx]
+    item = state["item"]
 
     prompt = (
         f"You are a clinical research analyst. Given the following CONSORT 2025 "
         f"checklist item, generate 2-5 specific search queries to retrieve relevant "
         f"evidence from a corpus of clinical trial documents (protocols, SAPs, "
         f"summary tables, ClinicalTrials.gov records).\n\n"
-        f"CONSORT Item ID: {item['id']}\n"
-        f"Section: {item['section']}\n"
-        f"Topic: {item['topic']}\n"
-        f"Description: {item['description']}\n\n"
-        f"Return ONLY a JSON array of query strings. Example:\n"
-        f'["query one", "query two", "query three"]'
+        f"CONSORT Item ID: {item.id}\n"
+        f"Section: {item.section}\n"
+        f"Topic: {item.topic}\n"
+        f"Description: {item.description}\n\n"
+        f"Return a JSON object with a \"queries\" array of query strings. Example:\n"
+        f'{{"queries": ["query one", "query two", "query three"]}}'
     )
 
     messages = [
@@ -130,35 +236,34 @@ def plan_research(state: AgentState) -> dict[str, Any]:
         {"role": "user", "content": prompt},
     ]
 
-    raw = _chat(
+    raw = await _achat(
         messages,
         max_completion_tokens=1024,
         reasoning_effort="low",
+        response_format={"type": "json_schema", "json_schema": QUERIES_SCHEMA},
     )
 
-    # Parse the JSON array of queries
-    try:
-        queries = json.loads(raw)
-        if not isinstance(queries, list):
-            queries = [raw]
-    except json.JSONDecodeError:
-        logger.warning("Failed to parse queries JSON, using raw text as single query")
-        queries = [raw]
+    parsed = _parse_structured(raw, "queries")
+    if parsed is not None and parsed.get("queries"):
+        queries = parsed["queries"]
+    else:
+        # Search for the checklist item itself
+        queries = [f"{item.topic}: {item.description}"]
 
     logger.info(
         "Plan research for item %s (%s): %d queries",
-        item["id"],
-        item["topic"],
+        item.id,
+        item.topic,
         len(queries),
     )
 
     return {
         "research_queries": queries,
         "retrieved_chunks": [],
+        "retrieved_chunk_hashes": set(),
         "hop_count": 0,
         "evaluation_result": "",
         "unfamiliar_terms": [],
-        "web_search_results": state.get("web_search_results", {}),
     }
 
 
@@ -166,38 +271,49 @@ def plan_research(state: AgentState) -> dict[str, Any]:
 # NODE 2: retrieve
 # ═══════════════════════════════════════════════════════════════════════
 
-def retrieve(state: AgentState) -> dict[str, Any]:
+async def retrieve(state: ItemState) -> dict[str, Any]:
     """
     Execute the research queries against Qdrant and accumulate results.
 
-    Uses multi_query_search for de-duplication across queries.
+    Uses multi_query_search for de-duplication across queries, and a
+    per-item set of content hashes for de-duplication across hops.
     """
     retriever = _get_retriever()
     queries = state["research_queries"]
 
-    chunks = retriever.multi_query_search(queries, top_k_per_query=5)
+    # The Qdrant client is synchronous – keep it off the event loop
+    chunks = await asyncio.to_thread(
+        retriever.multi_query_search, queries, top_k_per_query=5
+    )
 
-    # Convert to serialisable dicts
+    # Keep only chunks not already retrieved in a previous hop; each text
+    # is hashed once here rather than re-hashed on every hop.
+    seen = state.get("retrieved_chunk_hashes", set())
+    new_chunks = []
+    for c in chunks:
+        digest = hashlib.blake2b(c.text.encode("utf-8"), digest_size=16).hexdigest()
+        if digest not in seen:
+            seen.add(digest)
+            new_chunks.append(c)
+
+    # Convert to serialisable dicts.  The evidence strings used by the
+    # evaluate / synthesize prompts are formatted once here, since the same
+    # chunks are re-sent on every evaluate hop and again to synthesize.
     chunk_dicts = [
         {
             "text": c.text,
             "score": c.score,
             "source_file": c.source_file,
             "page_number": c.page_number,
+            "eval_fmt": f"{c.citation} {c.text[:500]}",
+            "synth_fmt": f"{c.citation}\n{c.text}",
         }
-        for c in chunks
+        for c in new_chunks
     ]
 
-    # Merge with any existing chunks from previous hops
-    existing = state.get("retrieved_chunks", [])
-    seen = {c["text"] for c in existing}
-    for cd in chunk_dicts:
-        if cd["text"] not in seen:
-            existing.append(cd)
-            seen.add(cd["text"])
-
     return {
-        "retrieved_chunks": existing,
+        "retrieved_chunks": [*state.get("retrieved_chunks", []), *chunk_dicts],
+        "retrieved_chunk_hashes": seen,
         "hop_count": state.get("hop_count", 0) + 1,
     }
 
@@ -206,37 +322,35 @@ def retrieve(state: AgentState) -> dict[str, Any]:
 # NODE 3: evaluate
 # ═══════════════════════════════════════════════════════════════════════
 
-def evaluate(state: AgentState) -> dict[str, Any]:
+async def evaluate(state: ItemState) -> dict[str, Any]:
     """
-    Assess whether the retrieved evidence is sufficient for the current
-    CONSORT item, or if we need more retrieval / web search.
+    Assess whether the retrieved evidence is sufficient for the CONSORT
+    item, or if we need more retrieval / web search.
 
     Returns one of:
       - "sufficient"  → proceed to synthesis
       - "need_more"   → another retrieval hop (if hop_count < 3)
       - "need_web"    → hydrate unfamiliar terms via You.com
     """
-    idx = state["current_item_index"]
-    item = state["consort_items"][idx]
+    item = state["item"]
     chunks = state["retrieved_chunks"]
     hop_count = state.get("hop_count", 0)
 
     # Build a summary of evidence
     evidence_summary = "\n\n".join(
-        f"[{c['source_file']} p.{c['page_number']}] {c['text'][:500]}"
-        for c in chunks[:15]  # cap to avoid token overflow
+        c["eval_fmt"] for c in chunks[:15]  # cap to avoid token overflow
     )
 
     prompt = (
         f"You are evaluating whether the following retrieved evidence is "
         f"sufficient to write the CONSORT report section below.\n\n"
-        f"CONSORT Item ID: {item['id']}\n"
-        f"Section: {item['section']}\n"
-        f"Topic: {item['topic']}\n"
-        f"Description: {item['description']}\n\n"
+        f"CONSORT Item ID: {item.id}\n"
+        f"Section: {item.section}\n"
+        f"Topic: {item.topic}\n"
+        f"Description: {item.description}\n\n"
         f"--- RETRIEVED EVIDENCE ---\n{evidence_summary}\n"
         f"--- END EVIDENCE ---\n\n"
-        f"Respond with a JSON object with exactly two keys:\n"
+        f"Respond with a JSON object with exactly these keys:\n"
         f'  "verdict": one of "sufficient", "need_more", or "need_web"\n'
         f'  "details": a brief explanation\n'
         f'  "unfamiliar_terms": list of any clinical/statistical terms in the '
@@ -250,28 +364,42 @@ def evaluate(state: AgentState) -> dict[str, Any]:
         {"role": "user", "content": prompt},
     ]
 
-    raw = _chat(messages, max_completion_tokens=2048, reasoning_effort="low")
-
-    try:
-        result = json.loads(raw)
-    except json.JSONDecodeError:
-        logger.warning("Failed to parse evaluation JSON; defaulting to sufficient")
-        result = {"verdict": "sufficient", "details": raw, "unfamiliar_terms": [], "follow_up_queries": []}
+    raw = await _achat(
+        messages,
+        max_completion_tokens=2048,
+        reasoning_effort="low",
+        response_format={"type": "json_schema", "json_schema": EVALUATION_SCHEMA},
+    )
 
-    verdict = result.get("verdict", "sufficient")
+    result = _parse_structured(raw, "evaluation")
+    if result is None:
+        result = {
+            "verdict": "sufficient",
+            "details": raw,
+            "unfamiliar_terms": [],
+            "follow_up_queries": [],
+        }
+    verdict = result["verdict"]
 
     # Force "sufficient" if we've exhausted hops
     if verdict == "need_more" and hop_count >= 3:
         logger.info("Max hops reached (%d); forcing sufficient", hop_count)
         verdict = "sufficient"
 
+    unfamiliar = result["unfamiliar_terms"]
+
+    # Nothing new to look up – a second web search would loop forever
+    known = state.get("web_search_results", {})
+    if verdict == "need_web" and all(t in known for t in unfamiliar):
+        logger.info("No unhydrated terms for item %s; forcing sufficient", item.id)
+        verdict = "sufficient"
+
     # If follow-up queries are provided, update research_queries for next hop
-    follow_ups = result.get("follow_up_queries", [])
-    unfamiliar = result.get("unfamiliar_terms", [])
+    follow_ups = result["follow_up_queries"]
 
     logger.info(
         "Evaluate item %s: verdict=%s, unfamiliar=%d terms, follow_ups=%d",
-        item["id"],
+        item.id,
         verdict,
         len(unfamiliar),
         len(follow_ups),
@@ -291,25 +419,24 @@ def evaluate(state: AgentState) -> dict[str, Any]:
 # NODE 4: web_search
 # ═══════════════════════════════════════════════════════════════════════
 
-def web_search(state: AgentState) -> dict[str, Any]:
+async def web_search(state: ItemState) -> dict[str, Any]:
     """
     Hydrate unfamiliar terms via You.com web search.
 
-    Merges new definitions into the existing web_search_results dict.
+    Returns only the newly hydrated definitions; the web_search_results
+    reducer merges them into the existing dict.
     """
-    you = _get_you_client()
+    you = get_you_client()
     terms = state.get("unfamiliar_terms", [])
 
     if not terms:
-        return {"web_search_results": state.get("web_search_results", {})}
-
-    new_defs = you.hydrate_terms(terms)
+        return {}
 
-    merged = {**state.get("web_search_results", {}), **new_defs}
-    logger.info("Web search hydrated %d terms (total: %d)", len(new_defs), len(merged))
+    new_defs = await you.hydrate_terms_async(terms)
+    logger.info("Web search hydrated %d terms", len(new_defs))
 
     return {
-        "web_search_results": merged,
+        "web_search_results": new_defs,
         # After hydration, re-evaluate
         "evaluation_result": "sufficient",
     }
@@ -319,21 +446,17 @@ def web_search(state: AgentState) -> dict[str, Any]:
 # NODE 5: synthesize
 # ═══════════════════════════════════════════════════════════════════════
 
-def synthesize(state: AgentState) -> dict[str, Any]:
+async def synthesize(state: ItemState) -> dict[str, Any]:
     """
     Synthesize retrieved evidence + web definitions into a prose draft
-    for the current CONSORT section.
+    for the CONSORT section.
     """
-    idx = state["current_item_index"]
-    item = state["consort_items"][idx]
+    item = state["item"]
     chunks = state["retrieved_chunks"]
     web_defs = state.get("web_search_results", {})
 
     # Build context
-    evidence = "\n\n".join(
-        f"[Source: {c['source_file']}, p.{c['page_number']}]\n{c['text']}"
-        for c in chunks[:20]
-    )
+    evidence = "\n\n".join(c["synth_fmt"] for c in chunks[:20])
 
     definitions_text = ""
     if web_defs:
@@ -343,9 +466,9 @@ def synthesize(state: AgentState) -> dict[str, Any]:
     prompt = (
         f"You are writing a section of a CONSORT 2025-compliant clinical trial "
         f"report. Using ONLY the evidence below, write the section described.\n\n"
-        f"CONSORT Item: {item['id']} – {item['topic']}\n"
-        f"Required content: {item['description']}\n"
-        f"Section: {item['section']}\n\n"
+        f"CONSORT Item: {item.id} – {item.topic}\n"
+        f"Required content: {item.description}\n"
+        f"Section: {item.section}\n\n"
         f"--- EVIDENCE FROM TRIAL DOCUMENTS ---\n{evidence}\n"
         f"--- END EVIDENCE ---\n"
         f"{definitions_text}\n\n"
@@ -362,33 +485,83 @@ def synthesize(state: AgentState) -> dict[str, Any]:
         {"role": "user", "content": prompt},
     ]
 
-    draft = _chat(messages, max_completion_tokens=4096, reasoning_effort="medium")
-
-    # Store the draft
-    drafts = {**state.get("section_drafts", {})}
-    drafts[item["id"]] = draft
+    draft = await _achat(messages, max_completion_tokens=4096, reasoning_effort="medium")
 
-    # Advance to next item
-    next_idx = idx + 1
+    # Checkpoint the draft so a crash later in the run doesn't lose it
+    drafts_dir = get_settings().drafts_dir
+    if drafts_dir is not None and draft:
+        drafts_dir.mkdir(parents=True, exist_ok=True)
+        tmp = drafts_dir / f"{item.id}.md.tmp"
+        tmp.write_text(draft, encoding="utf-8")
+        tmp.replace(drafts_dir / f"{item.id}.md")
 
     logger.info(
         "Synthesized item %s (%s): %d chars",
-        item["id"],
-        item["topic"],
+        item.id,
+        item.topic,
         len(draft),
     )
 
-    return {
-        "section_drafts": drafts,
-        "current_item_index": next_idx,
-    }
+    return {"draft": draft}
 
 
 # ═══════════════════════════════════════════════════════════════════════
 # NODE 6: generate_latex
 # ═══════════════════════════════════════════════════════════════════════
 
-def generate_latex(state: AgentState) -> dict[str, Any]:
+def _latex_messages(draft: str) -> list[dict[str, str]]:
+    """Build the LaTeX-formatting prompt for a single section draft."""
+    return [
+        {
+            "role": "developer",
+            "content": (
+                "You are a LaTeX formatting assistant. Convert the given text "
+                "into clean LaTeX markup. Use \\subsection, \\textbf, itemize/enumerate "
+                "environments, and \\begin{table} where appropriate. Do NOT wrap in "
+                "\\begin{document} or add a preamble – only produce the body content "
+                "for this section."
+            ),
+        },
+        {"role": "user", "content": draft},
+    ]
+
+
+async def _stream_latex(item_id: str, draft: str) -> str:
+    """
+    Convert one draft to LaTeX, streaming the response.
+
+    When ``settings.latex_stream_dir`` is set, complete lines are appended
+    to ``<dir>/<item_id>.tex`` as they arrive so progress is visible before
+    the whole document is assembled.
+    """
+    stream_dir = get_settings().latex_stream_dir
+    out = None
+    if stream_dir is not None:
+        stream_dir.mkdir(parents=True, exist_ok=True)
+        out = open(stream_dir / f"{item_id}.tex", "w", encoding="utf-8")
+
+    buf: list[str] = []
+    pending = ""  # text after the last newline not yet written
+    try:
+        async for token in _achat_stream(
+            _latex_messages(draft), max_completion_tokens=4096, reasoning_effort="low"
+        ):
+            buf.append(token)
+            if out is not None:
+                pending += token
+                if "\n" in pending:
+                    complete, pending = pending.rsplit("\n", 1)
+                    out.write(complete + "\n")
+                    out.flush()
+        if out is not None and pending:
+            out.write(pending)
+    finally:
+        if out is not None:
+            out.close()
+    return "".join(buf).strip()
+
+
+async def generate_latex(state: AgentState) -> dict[str, Any]:
     """
     Convert all section drafts into a complete LaTeX document.
 
@@ -397,31 +570,21 @@ def generate_latex(state: AgentState) -> dict[str, Any]:
     drafts = state.get("section_drafts", {})
     consort_items = state["consort_items"]
 
-    # Generate LaTeX for each section via the LLM
+    # Generate LaTeX for every drafted section concurrently via the LLM
+    drafted = [item for item in consort_items if drafts.get(item.id)]
+    tasks = [_stream_latex(item.id, drafts[item.id]) for item in drafted]
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
     latex_sections: dict[str, str] = {}
     for item in consort_items:
-        item_id = item["id"]
-        draft = drafts.get(item_id, "")
-        if not draft:
-            latex_sections[item_id] = f"% No evidence found for CONSORT item {item_id}\n"
-            continue
-
-        messages = [
-            {
-                "role": "developer",
-                "content": (
-                    "You are a LaTeX formatting assistant. Convert the given text "
-                    "into clean LaTeX markup. Use \\subsection, \\textbf, itemize/enumerate "
-                    "environments, and \\begin{table} where appropriate. Do NOT wrap in "
-                    "\\begin{document} or add a preamble – only produce the body content "
-                    "for this section."
-                ),
-            },
-            {"role": "user", "content": draft},
-        ]
-
-        latex_fragment = _chat(messages, max_completion_tokens=4096, reasoning_effort="low")
-        latex_sections[item_id] = latex_fragment
+        if not drafts.get(item.id):
+            latex_sections[item.id] = f"% No evidence found for CONSORT item {item.id}\n"
+    for item, result in zip(drafted, results):
+        if isinstance(result, BaseException):
+            logger.error("LaTeX conversion failed for item %s: %s", item.id, result)
+            latex_sections[item.id] = f"% LaTeX conversion failed for CONSORT item {item.id}\n"
+        else:
+            latex_sections[item.id] = result
 
     # Assemble the full document
     final_latex = sections_to_latex(consort_items, latex_sections)
@@ -7,17 +7,20 @@ results, section drafts, and the final LaTeX output.
 
 from __future__ import annotations
 
-from typing import Any, TypedDict
+import operator
+from typing import Annotated, Any, TypedDict
 
+import msgspec
 
-class ConsortItem(TypedDict):
-    """A single CONSORT checklist item."""
+
+class ConsortItem(msgspec.Struct, frozen=True):
+    """A single CONSORT checklist item (attribute access, no per-item dict)."""
 
     id: str
     section: str
     topic: str
     description: str
-    group: str  # e.g. "Randomisation", empty string if none
+    group: str = ""  # e.g. "Randomisation", empty string if none
 
 
 class RetrievedChunkDict(TypedDict):
@@ -27,36 +30,56 @@ class RetrievedChunkDict(TypedDict):
     score: float
     source_file: str
     page_number: int
+    eval_fmt: str        # "[file p.N] text[:500]" for the evaluate prompt
+    synth_fmt: str       # "[file p.N]\ntext" for the synthesize prompt
 
 
-class AgentState(TypedDict):
+class ItemState(TypedDict):
     """
-    Full state that flows through the LangGraph deep-research graph.
+    Research state for a single CONSORT item.
 
-    Fields are accumulated across nodes; LangGraph merges dicts automatically
-    when a node returns a partial update.
+    Each item is researched independently (plan → retrieve → evaluate →
+    synthesize), so every item carries its own copy of these fields.
     """
 
-    # ── CONSORT items to fulfil ─────────────────────────────────────────
-    consort_items: list[ConsortItem]
-    current_item_index: int
+    item: ConsortItem
 
     # ── Research planning ───────────────────────────────────────────────
-    research_queries: list[str]          # queries for the current item
+    research_queries: list[str]          # queries for the next retrieval hop
 
     # ── Retrieval results ───────────────────────────────────────────────
     retrieved_chunks: list[RetrievedChunkDict]
+    retrieved_chunk_hashes: set[str]     # blake2b digests of retrieved texts
 
     # ── Web search hydration ────────────────────────────────────────────
     unfamiliar_terms: list[str]
-    web_search_results: dict[str, str]   # term -> definition
+    web_search_results: Annotated[dict[str, str], operator.or_]  # term -> definition
 
     # ── Evaluation ──────────────────────────────────────────────────────
     evaluation_result: str               # "sufficient" | "need_more" | "need_web"
     hop_count: int                       # multi-hop counter (max 3)
 
     # ── Synthesis ───────────────────────────────────────────────────────
-    section_drafts: dict[str, str]       # consort item id -> prose draft
+    draft: str                           # prose draft for this item
+
+
+class AgentState(TypedDict):
+    """
+    Full state that flows through the LangGraph deep-research graph.
+
+    Fields are accumulated across nodes.  The dict fields annotated with a
+    reducer are merged by LangGraph, so nodes return only the new entries.
+    """
+
+    # ── CONSORT items to fulfil ─────────────────────────────────────────
+    consort_items: list[ConsortItem]
+
+    # ── Per-item research ───────────────────────────────────────────────
+    item_states: Annotated[dict[str, ItemState], operator.or_]   # consort item id -> research substate
+    web_search_results: Annotated[dict[str, str], operator.or_]  # term -> definition (all items)
+
+    # ── Synthesis ───────────────────────────────────────────────────────
+    section_drafts: Annotated[dict[str, str], operator.or_]      # consort item id -> prose draft
 
     # ── LaTeX output ────────────────────────────────────────────────────
     latex_sections: dict[str, str]       # consort item id -> LaTeX fragment
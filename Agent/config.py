@@ -14,13 +14,20 @@ API reference: https://platform.openai.com/docs/api-reference/chat/create
 
 from __future__ import annotations
 
+import functools
 import os
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+    from qdrant_client import AsyncQdrantClient, QdrantClient
+
+    from search.you_client import YouSearchClient
+
 
 _PROJECT_ROOT = Path(__file__).resolve().parent
 
@@ -40,9 +47,33 @@ class Settings(BaseSettings):
         default="clinical_trial_docs",
         description="Name of the Qdrant collection",
     )
+    qdrant_prefer_grpc: bool = Field(
+        default=False,
+        description="Talk to Qdrant over gRPC (port 6334) instead of REST",
+    )
+    upload_concurrency: int = Field(
+        default=4,
+        description="Max embed + upsert batches in flight during ingest",
+    )
+    file_concurrency: int = Field(
+        default=4,
+        description="Uploaded files processed concurrently by the API server",
+    )
+    qdrant_bulk_upload: bool = Field(
+        default=False,
+        description="Upload with upload_collection (large batches; not behind the Akash nginx limit)",
+    )
+    qdrant_upload_parallel: int = Field(
+        default_factory=lambda: max(1, (os.cpu_count() or 2) // 2),
+        description="Worker processes for upload_collection when bulk upload is on",
+    )
 
     # ── You.com Web Search ─────────────────────────────────────────────
     ydc_api_key: str = Field(..., description="You.com Data API key")
+    ydc_max_concurrency: int = Field(
+        default=10,
+        description="Max concurrent You.com term lookups",
+    )
 
     # ── Embedding model ────────────────────────────────────────────────
     embedding_model: str = Field(
@@ -54,6 +85,20 @@ class Settings(BaseSettings):
         description="Dimensionality of the embedding vectors",
     )
 
+    # ── Query similarity cache ─────────────────────────────────────────
+    qvcache_capacity: int = Field(
+        default=512,
+        description="Number of recent query embeddings kept for similarity lookup",
+    )
+    qvcache_threshold: float = Field(
+        default=0.95,
+        description="Full-vector cosine similarity above which cached search results are reused",
+    )
+    qvcache_key_dims: int = Field(
+        default=256,
+        description="Leading embedding dimensions (as int8) used to shortlist cache candidates",
+    )
+
     # ── LLM (GPT-5.2) ─────────────────────────────────────────────────
     llm_model: str = Field(
         default="gpt-5.2",
@@ -67,12 +112,47 @@ class Settings(BaseSettings):
         default="low",
         description="Reasoning effort: none | minimal | low | medium | high | xhigh",
     )
+    llm_max_concurrency: int = Field(
+        default=8,
+        description="Max Chat Completions calls in flight at once (rate-limit guard)",
+    )
+
+    # ── Agent ──────────────────────────────────────────────────────────
+    item_concurrency: int = Field(
+        default=8,
+        description="Max CONSORT items researched concurrently",
+    )
+
+    # ── Caching ────────────────────────────────────────────────────────
+    chat_cache_enabled: bool = Field(
+        default=True,
+        description="Reuse Chat Completions responses for identical requests",
+    )
+    embed_cache_enabled: bool = Field(
+        default=True,
+        description="Reuse embeddings of previously embedded chunk / query texts",
+    )
+    cache_dir: Path = Field(
+        default=Path.home() / ".cache" / "consort-agent",
+        description="Directory for persistent caches (chat.sqlite, embeddings.sqlite)",
+    )
 
     # ── Paths ──────────────────────────────────────────────────────────
     consort_json_path: Path = Field(
         default=_PROJECT_ROOT / "consort.json",
         description="Path to the CONSORT 2025 checklist JSON",
     )
+    drafts_dir: Optional[Path] = Field(
+        default=None,
+        description=(
+            "If set, section drafts are checkpointed here and reused by the next "
+            "run (CLI resume); not for the server, whose runs would share them"
+        ),
+    )
+    latex_stream_dir: Optional[Path] = Field(
+        default=None,
+        description="If set, per-section LaTeX is streamed into <dir>/<item_id>.tex",
+    )
 
     class Config:
         env_file = str(_PROJECT_ROOT / ".env")
@@ -80,6 +160,80 @@ class Settings(BaseSettings):
         extra = "ignore"
 
 
+@functools.lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """Return a cached Settings instance."""
     return Settings()
+
+
+# ── Shared API clients ──────────────────────────────────────────────────
+# One instance of each per process, so connection pools (and their TLS
+# sessions) are reused across files, requests and graph nodes.
+
+@functools.lru_cache(maxsize=1)
+def get_openai() -> OpenAI:
+    """Return the shared synchronous OpenAI client."""
+    from openai import OpenAI
+
+    return OpenAI(api_key=get_settings().openai_api_key)
+
+
+@functools.lru_cache(maxsize=1)
+def get_async_openai() -> AsyncOpenAI:
+    """Return the shared AsyncOpenAI client (on the HTTP/2 transport)."""
+    from openai import AsyncOpenAI
+
+    from agent.http import get_shared_client
+
+    return AsyncOpenAI(api_key=get_settings().openai_api_key, http_client=get_shared_client())
+
+
+@functools.lru_cache(maxsize=1)
+def get_qdrant() -> QdrantClient:
+    """Return the shared synchronous Qdrant client."""
+    from qdrant_client import QdrantClient
+
+    settings = get_settings()
+    return QdrantClient(
+        url=settings.qdrant_url,
+        api_key=settings.qdrant_api_key,
+        prefer_grpc=settings.qdrant_prefer_grpc,
+        timeout=60,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_async_qdrant() -> AsyncQdrantClient:
+    """Return the shared AsyncQdrantClient."""
+    from qdrant_client import AsyncQdrantClient
+
+    settings = get_settings()
+    return AsyncQdrantClient(
+        url=settings.qdrant_url,
+        api_key=settings.qdrant_api_key,
+        prefer_grpc=settings.qdrant_prefer_grpc,
+        timeout=60,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_you_client() -> YouSearchClient:
+    """Return the shared You.com search client (its term memo is process-wide)."""
+    from search.you_client import YouSearchClient
+
+    return YouSearchClient(get_settings())
+
+
+async def aclose_async_clients() -> None:
+    """Close the async clients and drop the asyncio primitives bound to the running loop."""
+    from agent.http import aclose_shared_client
+    from agent.nodes import _get_llm_semaphore
+    from ingest.uploader import _get_pause_lock
+
+    if get_async_qdrant.cache_info().currsize:
+        await get_async_qdrant().close()
+        get_async_qdrant.cache_clear()
+    get_async_openai.cache_clear()
+    await aclose_shared_client()
+    _get_llm_semaphore.cache_clear()
+    _get_pause_lock.cache_clear()
@@ -1,23 +1,85 @@
 """
 Text chunking with configurable size and overlap.
 
-Uses LangChain's RecursiveCharacterTextSplitter for intelligent splitting
-that tries to keep semantically coherent units together.
+Splits on the same boundary hierarchy as a recursive character splitter
+(paragraph → line → sentence → word) so chunks keep semantically coherent
+units together, but walks each document once: every cut point is found
+with a bounded ``str.rfind`` over the current window instead of
+recursively re-splitting and re-merging substrings.
 """
 
 from __future__ import annotations
 
 import logging
+from functools import lru_cache
 from typing import Any
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-
 logger = logging.getLogger(__name__)
 
 # Defaults tuned for clinical trial documents
 DEFAULT_CHUNK_SIZE = 1000  # characters
 DEFAULT_CHUNK_OVERLAP = 200
 
+# Chunk boundaries in order of preference
+_SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+
+class _BoundarySplitter:
+    """
+    Greedy single-pass splitter.
+
+    Each chunk is the longest span (≤ chunk_size) that ends on the most
+    preferred boundary inside the window; the next chunk starts on a word
+    boundary up to chunk_overlap characters before the previous chunk's
+    end.  A window with no boundary at all is hard-cut at chunk_size.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int) -> None:
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})"
+            )
+        self._chunk_size = chunk_size
+        self._chunk_overlap = chunk_overlap
+
+    def split_text(self, text: str) -> list[str]:
+        chunks: list[str] = []
+        n = len(text)
+        pos = 0
+        covered = 0  # end of the previous chunk
+        while pos < n:
+            limit = pos + self._chunk_size
+            if limit >= n:
+                end = n
+            else:
+                # A cut must extend past the previous chunk, or the chunk
+                # would be nothing but overlap.
+                floor = max(pos, covered)
+                end = limit
+                for sep in _SEPARATORS:
+                    i = text.rfind(sep, floor, limit)
+                    if i != -1:
+                        end = i + len(sep)
+                        break
+
+            piece = text[pos:end].strip()
+            if piece:
+                chunks.append(piece)
+            if end >= n:
+                break
+
+            # Step back by up to chunk_overlap characters, onto a word start
+            covered = end
+            i = text.find(" ", max(end - self._chunk_overlap, pos + 1), end)
+            pos = i + 1 if i != -1 else end
+        return chunks
+
+
+@lru_cache(maxsize=8)
+def _get_splitter(chunk_size: int, chunk_overlap: int) -> _BoundarySplitter:
+    """Return a shared splitter for the given size/overlap (validated once)."""
+    return _BoundarySplitter(chunk_size, chunk_overlap)
+
 
 def chunk_documents(
     documents: list[dict[str, Any]],
@@ -30,12 +92,7 @@ def chunk_documents(
     Each input document has {"text": ..., "metadata": {...}}.
     Returns chunks with the same structure, plus a "chunk_index" in metadata.
     """
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        length_function=len,
-        separators=["\n\n", "\n", ". ", " ", ""],
-    )
+    splitter = _get_splitter(chunk_size, chunk_overlap)
 
     chunks: list[dict[str, Any]] = []
     for doc in documents:
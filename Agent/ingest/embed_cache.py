@@ -0,0 +1,100 @@
+"""
+Persistent cache for embedding vectors.
+
+Re-ingesting a corpus or re-running the agent embeds the same chunk and
+query texts again.  Vectors are stored in SQLite keyed by the SHA-256 of
+the text and scoped by (model, dimensions), so switching embedding model
+never returns stale vectors.  They are stored as float16 (6 KiB for a
+3072-dim vector) and returned as float32.
+
+One cache (and SQLite connection) is shared per process; its methods block
+on disk I/O, so async callers run them with ``asyncio.to_thread``.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config import Settings
+
+logger = logging.getLogger(__name__)
+
+_SQL_VARS = 900  # stay under SQLite's bound-parameter limit per IN (...)
+
+
+class EmbedCache:
+    """SQLite-backed map of text → embedding for one (model, dims) pair."""
+
+    def __init__(self, path: Path, model: str, dims: int) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._model = model
+        self._dims = dims
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embed_cache ("
+            "model TEXT NOT NULL, dims INTEGER NOT NULL, hash BLOB NOT NULL, vec BLOB NOT NULL, "
+            "PRIMARY KEY (model, dims, hash))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        logger.info("Embedding cache at %s (%s, %d dims)", path, model, dims)
+
+    @staticmethod
+    def _hash(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def get_many(self, texts: list[str]) -> list[Optional[np.ndarray]]:
+        """Return the cached float32 vector for each text (None on a miss)."""
+        hashes = [self._hash(t) for t in texts]
+        found: dict[bytes, bytes] = {}
+        with self._lock:
+            for i in range(0, len(hashes), _SQL_VARS):
+                part = hashes[i : i + _SQL_VARS]
+                rows = self._conn.execute(
+                    "SELECT hash, vec FROM embed_cache WHERE model = ? AND dims = ? "
+                    f"AND hash IN ({','.join('?' * len(part))})",
+                    (self._model, self._dims, *part),
+                ).fetchall()
+                found.update(rows)
+        return [
+            np.frombuffer(found[h], dtype=np.float16).astype(np.float32) if h in found else None
+            for h in hashes
+        ]
+
+    def put_many(self, texts: list[str], vectors: list[list[float]] | np.ndarray) -> None:
+        """Store embeddings for *texts* (existing entries are kept)."""
+        rows = [
+            (self._model, self._dims, self._hash(t), np.asarray(v, dtype=np.float16).tobytes())
+            for t, v in zip(texts, vectors)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embed_cache (model, dims, hash, vec) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+
+@functools.cache
+def _shared_cache(path: Path, model: str, dims: int) -> EmbedCache:
+    return EmbedCache(path, model, dims)
+
+
+def open_embed_cache(settings: Settings) -> Optional[EmbedCache]:
+    """The process-wide embedding cache for the configured model (None if disabled)."""
+    if not settings.embed_cache_enabled:
+        return None
+    return _shared_cache(
+        settings.cache_dir / "embeddings.sqlite",
+        settings.embedding_model,
+        settings.embedding_dimensions,
+    )
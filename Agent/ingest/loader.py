@@ -4,12 +4,17 @@ Multi-format document loader.
 Supported formats: PDF (.pdf), Word (.docx), plain text (.txt).
 Each loaded document is returned as a list of dicts with keys:
   - text: str
-  - metadata: dict (source_file, file_type, page_number)
+  - metadata: dict (source_file, file_type, page_number, citation)
+
+``citation`` is the preformatted "[file p.N]" reference used in prompts, so
+it does not have to be rebuilt for every chunk on every query.
 """
 
 from __future__ import annotations
 
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
 
@@ -21,6 +26,7 @@ def _load_pdf(path: Path) -> list[dict[str, Any]]:
     import fitz  # pymupdf
 
     docs: list[dict[str, Any]] = []
+    name = path.name
     with fitz.open(str(path)) as pdf:
         for page_num, page in enumerate(pdf, start=1):
             text = page.get_text("text")
@@ -29,9 +35,10 @@ def _load_pdf(path: Path) -> list[dict[str, Any]]:
                     {
                         "text": text,
                         "metadata": {
-                            "source_file": path.name,
+                            "source_file": name,
                             "file_type": "pdf",
                             "page_number": page_num,
+                            "citation": f"[{name} p.{page_num}]",
                         },
                     }
                 )
@@ -53,6 +60,7 @@ def _load_docx(path: Path) -> list[dict[str, Any]]:
                 "source_file": path.name,
                 "file_type": "docx",
                 "page_number": 1,  # DOCX doesn't have native pages
+                "citation": f"[{path.name} p.1]",
             },
         }
     ]
@@ -70,6 +78,7 @@ def _load_txt(path: Path) -> list[dict[str, Any]]:
                 "source_file": path.name,
                 "file_type": "txt",
                 "page_number": 1,
+                "citation": f"[{path.name} p.1]",
             },
         }
     ]
@@ -94,10 +103,24 @@ def load_file(path: Path) -> list[dict[str, Any]]:
 
 
 def load_directory(dir_path: Path) -> list[dict[str, Any]]:
-    """Recursively load all supported files from a directory."""
-    all_docs: list[dict[str, Any]] = []
-    for fpath in sorted(dir_path.rglob("*")):
-        if fpath.is_file() and fpath.suffix.lower() in _LOADERS:
-            all_docs.extend(load_file(fpath))
+    """
+    Recursively load all supported files from a directory.
+
+    Text extraction is CPU-bound, so files are spread across a process
+    pool; results keep the sorted file order.
+    """
+    paths = [
+        p for p in sorted(dir_path.rglob("*"))
+        if p.is_file() and p.suffix.lower() in _LOADERS
+    ]
+
+    if len(paths) <= 1:
+        per_file = [load_file(p) for p in paths]
+    else:
+        workers = min(len(paths), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            per_file = list(pool.map(load_file, paths, chunksize=4))
+
+    all_docs: list[dict[str, Any]] = [doc for docs in per_file for doc in docs]
     logger.info("Loaded %d document segments from %s", len(all_docs), dir_path)
     return all_docs
@@ -0,0 +1,82 @@
+"""
+Retry policies for the external APIs used during ingest and retrieval.
+
+Transient failures (connection resets, 5xx, rate limiting) on one batch
+should not abort an ingest that has already uploaded thousands of points,
+so the per-batch calls are retried with jittered exponential backoff.
+OpenAI rate-limit responses carry a Retry-After header; when present it is
+used as the wait instead of the backoff schedule.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import httpx
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from qdrant_client.http.exceptions import ResponseHandlingException, UnexpectedResponse
+from tenacity import (
+    RetryCallState,
+    before_sleep_log,
+    retry,
+    retry_if_exception,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _is_transient_qdrant_error(exc: BaseException) -> bool:
+    if isinstance(exc, UnexpectedResponse):
+        return exc.status_code is not None and (exc.status_code == 429 or exc.status_code >= 500)
+    return isinstance(exc, (ResponseHandlingException, httpx.TransportError))
+
+
+# Decorator for Qdrant write calls (upserts)
+qdrant_retry = retry(
+    retry=retry_if_exception(_is_transient_qdrant_error),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    stop=stop_after_attempt(5),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True,
+)
+
+
+_backoff = wait_random_exponential(multiplier=1, max=60)
+
+
+def _retry_after_seconds(exc: BaseException | None) -> float | None:
+    """Read the server-requested delay from an OpenAI error response."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if (ms := headers.get("retry-after-ms")) is not None:
+            return float(ms) / 1000
+        if (sec := headers.get("retry-after")) is not None:
+            return float(sec)
+    except ValueError:  # HTTP-date form; fall back to backoff
+        return None
+    return None
+
+
+def _wait_retry_after(state: RetryCallState) -> float:
+    delay = _retry_after_seconds(state.outcome.exception() if state.outcome else None)
+    if delay is not None:
+        return min(delay, 60.0)
+    return _backoff(state)
+
+
+# Decorator for OpenAI embedding calls
+openai_retry = retry(
+    retry=retry_if_exception_type(
+        (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+    ),
+    wait=_wait_retry_after,
+    stop=stop_after_attempt(6),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True,
+)
@@ -7,8 +7,9 @@ and produces a full .tex file ready for compilation.
 
 from __future__ import annotations
 
+import io
 import logging
-from typing import Any
+from typing import TYPE_CHECKING
 
 from latex.templates import (
     PREAMBLE,
@@ -20,90 +21,108 @@ from latex.templates import (
     CONSORT_TABLE_FOOTER,
 )
 
+if TYPE_CHECKING:
+    from agent.state import ConsortItem
+
 logger = logging.getLogger(__name__)
 
 
+# Single-pass translation table for LaTeX special characters
+_LATEX_ESCAPES = str.maketrans({
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+})
+
+
 def _escape_latex(text: str) -> str:
     """Escape special LaTeX characters in plain text."""
-    replacements = {
-        "&": r"\&",
-        "%": r"\%",
-        "$": r"\$",
-        "#": r"\#",
-        "_": r"\_",
-        "{": r"\{",
-        "}": r"\}",
-        "~": r"\textasciitilde{}",
-        "^": r"\textasciicircum{}",
-    }
-    for char, escaped in replacements.items():
-        text = text.replace(char, escaped)
-    return text
+    return text.translate(_LATEX_ESCAPES)
 
 
 def sections_to_latex(
-    consort_items: list[dict[str, Any]],
+    consort_items: list[ConsortItem],
     latex_sections: dict[str, str],
 ) -> str:
     """
     Assemble the full LaTeX document.
 
     Args:
-        consort_items: List of CONSORT item dicts (id, section, topic, description).
+        consort_items: List of CONSORT items (id, section, topic, description).
         latex_sections: Dict mapping item id to its LaTeX body fragment.
 
     Returns:
         Complete LaTeX source as a string.
     """
-    parts: list[str] = [PREAMBLE, "", BEGIN_DOCUMENT, ""]
+    buf = io.StringIO()
+    write = buf.write
+
+    def line(text: str) -> None:
+        write(text)
+        write("\n")
+
+    line(PREAMBLE)
+    line("")
+    line(BEGIN_DOCUMENT)
+    line("")
 
     current_section = ""
     current_topic = ""
+    # Checklist-table rows are built in the same pass as the section bodies
+    table_rows: list[str] = []
 
     for item in consort_items:
-        item_id = item["id"]
-        section_name = item["section"]
-        topic = item["topic"]
+        item_id = item.id
+        section_name = item.section
+        topic = item.topic
+        table_rows.append(
+            CONSORT_TABLE_ROW.format(
+                item_id=_escape_latex(item_id),
+                section=_escape_latex(section_name),
+                topic=_escape_latex(topic),
+                description=_escape_latex(item.description[:80] + "..."),
+            )
+        )
 
         # Insert \section{} when we enter a new CONSORT section
         if section_name != current_section:
             current_section = section_name
             current_topic = ""  # reset topic
             sec_cmd = SECTION_COMMANDS.get(section_name, rf"\section{{{section_name}}}")
-            parts.append("")
-            parts.append(sec_cmd)
+            line("")
+            line(sec_cmd)
 
         # Insert \subsection{} when we enter a new topic within a section
         if topic != current_topic:
             current_topic = topic
-            parts.append(rf"\subsection{{{topic}}}")
-            parts.append(rf"\label{{sec:{item_id}}}")
+            line(rf"\subsection{{{topic}}}")
+            line(rf"\label{{sec:{item_id}}}")
 
         # Insert the LaTeX body for this item
         fragment = latex_sections.get(item_id, "")
         if fragment:
-            parts.append("")
-            parts.append(f"% --- CONSORT Item {item_id}: {topic} ---")
-            parts.append(fragment)
+            line("")
+            line(f"% --- CONSORT Item {item_id}: {topic} ---")
+            line(fragment)
         else:
-            parts.append(f"\n% CONSORT Item {item_id}: No evidence available.\n")
+            line(f"\n% CONSORT Item {item_id}: No evidence available.\n")
 
     # Append the CONSORT compliance checklist table
-    parts.append("")
-    parts.append(CONSORT_TABLE_HEADER)
-    for item in consort_items:
-        row = CONSORT_TABLE_ROW.format(
-            item_id=_escape_latex(item["id"]),
-            section=_escape_latex(item["section"]),
-            topic=_escape_latex(item["topic"]),
-            description=_escape_latex(item["description"][:80] + "..."),
-        )
-        parts.append(row)
-    parts.append(CONSORT_TABLE_FOOTER)
+    line("")
+    line(CONSORT_TABLE_HEADER)
+    for row in table_rows:
+        line(row)
+    line(CONSORT_TABLE_FOOTER)
 
-    parts.append("")
-    parts.append(END_DOCUMENT)
+    line("")
+    write(END_DOCUMENT)
 
-    doc = "\n".join(parts)
+    doc = buf.getvalue()
     logger.info("Assembled LaTeX document: %d lines, %d chars", doc.count("\n"), len(doc))
     return doc
@@ -13,6 +13,7 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import asyncio
 import logging
 import sys
 from pathlib import Path
@@ -65,8 +66,8 @@ def cmd_ingest(args: argparse.Namespace) -> None:
 
 def cmd_generate(args: argparse.Namespace) -> None:
     """Run the deep-research agent and produce a LaTeX report."""
-    from config import get_settings
-    from agent.graph import build_graph, create_initial_state
+    from config import aclose_async_clients, get_settings
+    from agent.graph import build_graph, clear_draft_checkpoints, create_initial_state
 
     settings = get_settings()
     output_path = Path(args.output)
@@ -83,7 +84,13 @@ def cmd_generate(args: argparse.Namespace) -> None:
 
     # Run the graph
     logger.info("Processing %d CONSORT items...", len(initial_state["consort_items"]))
-    final_state = app.invoke(initial_state)
+    async def _run() -> dict:
+        try:
+            return await app.ainvoke(initial_state)
+        finally:
+            await aclose_async_clients()
+
+    final_state = asyncio.run(_run())
 
     # Write output
     final_latex = final_state.get("final_latex", "")
@@ -92,6 +99,7 @@ def cmd_generate(args: argparse.Namespace) -> None:
         sys.exit(1)
 
     output_path.write_text(final_latex, encoding="utf-8")
+    clear_draft_checkpoints()
     logger.info("=== Report written to %s (%d chars) ===", output_path, len(final_latex))
 
 
@@ -10,13 +10,16 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 
-from openai import OpenAI
-from qdrant_client import QdrantClient
-from qdrant_client.models import Filter, FieldCondition, MatchValue
+import numpy as np
+import xxhash
+from qdrant_client.models import Filter, FieldCondition, MatchValue, QueryRequest
 
-from config import Settings
+from config import Settings, get_openai, get_qdrant
+from ingest.embed_cache import open_embed_cache
+from ingest.retry import openai_retry
+from retrieval.qvcache import QVCache
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +32,7 @@ class RetrievedChunk:
     score: float
     source_file: str
     page_number: int
+    citation: str = ""  # "[file p.N]", precomputed at ingest
     metadata: dict[str, Any] = field(default_factory=dict)
 
 
@@ -37,13 +41,16 @@ class QdrantRetriever:
 
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
-        self._openai = OpenAI(api_key=settings.openai_api_key)
-        self._qdrant = QdrantClient(
-            url=settings.qdrant_url,
-            api_key=settings.qdrant_api_key,
-            timeout=60,
-        )
+        self._openai = get_openai()
+        self._qdrant = get_qdrant()
         self._collection = settings.qdrant_collection_name
+        self._embed_cache = open_embed_cache(settings)
+        self._qvcache = QVCache(
+            dims=settings.embedding_dimensions,
+            capacity=settings.qvcache_capacity,
+            threshold=settings.qvcache_threshold,
+            key_dims=settings.qvcache_key_dims,
+        )
 
     # ── public API ──────────────────────────────────────────────────────
 
@@ -67,42 +74,7 @@ class QdrantRetriever:
             List of RetrievedChunk objects ordered by descending relevance.
         """
         query_vector = self._embed(query)
-
-        query_filter = None
-        if source_file:
-            query_filter = Filter(
-                must=[
-                    FieldCondition(
-                        key="source_file",
-                        match=MatchValue(value=source_file),
-                    )
-                ]
-            )
-
-        results = self._qdrant.search(
-            collection_name=self._collection,
-            query_vector=query_vector,
-            limit=top_k,
-            query_filter=query_filter,
-            score_threshold=score_threshold,
-        )
-
-        chunks = []
-        for hit in results:
-            payload = hit.payload or {}
-            chunks.append(
-                RetrievedChunk(
-                    text=payload.get("text", ""),
-                    score=hit.score,
-                    source_file=payload.get("source_file", ""),
-                    page_number=payload.get("page_number", 0),
-                    metadata={
-                        k: v
-                        for k, v in payload.items()
-                        if k not in ("text",)
-                    },
-                )
-            )
+        chunks = self._search_vector(query_vector, top_k, source_file, score_threshold)
 
         logger.info(
             "Search for '%s' returned %d results (top score: %.3f)",
@@ -121,35 +93,137 @@ class QdrantRetriever:
         Execute multiple queries and return de-duplicated, re-ranked results.
 
         Used for multi-hop retrieval where the agent decomposes a complex
-        question into several sub-queries.
+        question into several sub-queries.  Queries that are near-duplicates
+        of recently executed ones are answered from the similarity cache;
+        the rest are embedded in one request and searched in one batch.
         """
-        seen_texts: set[str] = set()
-        all_chunks: list[RetrievedChunk] = []
-
-        for q in queries:
-            results = self.search(q, top_k=top_k_per_query)
+        per_query = self._qvcache.get_or_search(
+            queries,
+            top_k_per_query,
+            embed_many=self.embed_many,
+            search_many=lambda vecs: self._search_batch(vecs, top_k_per_query),
+        )
+        # Deduplicate by text hash, keeping the best-scoring copy of each chunk
+        best: dict[int, RetrievedChunk] = {}
+        for results in per_query:
             for chunk in results:
-                # Deduplicate by exact text match
-                if chunk.text not in seen_texts:
-                    seen_texts.add(chunk.text)
-                    all_chunks.append(chunk)
-
-        # Re-rank by score descending
-        all_chunks.sort(key=lambda c: c.score, reverse=True)
+                h = xxhash.xxh3_64_intdigest(chunk.text.encode("utf-8"))
+                kept = best.get(h)
+                if kept is None or chunk.score > kept.score:
+                    best[h] = chunk
+
+        # Re-rank by score descending; scores are kept as an array so later
+        # vectorised re-rank passes (e.g. MMR) can operate on them directly
+        candidates = list(best.values())
+        scores = np.fromiter((c.score for c in candidates), dtype=np.float32, count=len(candidates))
+        order = np.argsort(-scores, kind="stable")
+        all_chunks = [candidates[i] for i in order]
         logger.info(
-            "Multi-query search (%d queries) returned %d unique chunks",
+            "Multi-query search (%d queries) returned %d unique chunks "
+            "(query cache: %d hits / %d misses)",
             len(queries),
             len(all_chunks),
+            self._qvcache.hits,
+            self._qvcache.misses,
         )
         return all_chunks
 
+    def embed_many(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed a batch of texts in a single Embeddings API request.
+
+        Texts found in the embedding cache are not sent.  Returns a
+        (len(texts), dims) float32 array in input order.
+        """
+        vectors = np.zeros((len(texts), self._settings.embedding_dimensions), dtype=np.float32)
+        cached = self._embed_cache.get_many(texts) if self._embed_cache else [None] * len(texts)
+        missing = [i for i, v in enumerate(cached) if v is None]
+        for i, v in enumerate(cached):
+            if v is not None:
+                vectors[i] = v
+        if missing:
+            fresh = self._create_embeddings([texts[i] for i in missing])
+            vectors[missing] = fresh
+            if self._embed_cache is not None:
+                self._embed_cache.put_many([texts[i] for i in missing], fresh)
+        return vectors
+
     # ── internals ───────────────────────────────────────────────────────
 
-    def _embed(self, text: str) -> list[float]:
-        """Embed a single text using the configured OpenAI model."""
+    def _search_batch(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int,
+    ) -> list[list[RetrievedChunk]]:
+        """Run one vector query per row of *query_vectors* in a single request."""
+        responses = self._qdrant.query_batch_points(
+            collection_name=self._collection,
+            requests=[
+                QueryRequest(query=v.tolist(), limit=top_k, with_payload=True)
+                for v in query_vectors
+            ],
+        )
+        return [[self._to_chunk(hit) for hit in response.points] for response in responses]
+
+    def _search_vector(
+        self,
+        query_vector: Sequence[float],
+        top_k: int,
+        source_file: Optional[str] = None,
+        score_threshold: Optional[float] = None,
+    ) -> list[RetrievedChunk]:
+        """Run a vector search against the collection."""
+        query_filter = None
+        if source_file:
+            query_filter = Filter(
+                must=[
+                    FieldCondition(
+                        key="source_file",
+                        match=MatchValue(value=source_file),
+                    )
+                ]
+            )
+
+        results = self._qdrant.search(
+            collection_name=self._collection,
+            query_vector=list(map(float, query_vector)),
+            limit=top_k,
+            query_filter=query_filter,
+            score_threshold=score_threshold,
+        )
+
+        return [self._to_chunk(hit) for hit in results]
+
+    @staticmethod
+    def _to_chunk(hit: Any) -> RetrievedChunk:
+        """Convert a Qdrant scored point into a RetrievedChunk."""
+        payload = hit.payload or {}
+        source_file = payload.get("source_file", "")
+        page_number = payload.get("page_number", 0)
+        return RetrievedChunk(
+            text=payload.get("text", ""),
+            score=hit.score,
+            source_file=source_file,
+            page_number=page_number,
+            # Points ingested before citations were stored need it built here
+            citation=payload.get("citation") or f"[{source_file} p.{page_number}]",
+            metadata={
+                k: v
+                for k, v in payload.items()
+                if k not in ("text",)
+            },
+        )
+
+    @openai_retry
+    def _create_embeddings(self, texts: list[str]) -> np.ndarray:
+        """Call the Embeddings API (retried on rate limits / transient errors)."""
         response = self._openai.embeddings.create(
-            input=[text],
+            input=texts,
             model=self._settings.embedding_model,
             dimensions=self._settings.embedding_dimensions,
         )
-        return response.data[0].embedding
+        return np.asarray([item.embedding for item in response.data], dtype=np.float32)
+
+    def _embed(self, text: str) -> list[float]:
+        """Embed a single text using the configured OpenAI model."""
+        return self.embed_many([text])[0].tolist()
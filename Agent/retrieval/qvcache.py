@@ -0,0 +1,225 @@
+"""
+Similarity cache for Qdrant query results.
+
+Across the CONSORT items and their retrieval hops the agent issues many
+near-duplicate queries ("randomization procedure" vs. "randomisation
+method").  QVCache keeps the embeddings of recent queries in a fixed-size
+ring buffer and, when a new query lands within ``threshold`` cosine
+similarity of a cached one, returns the cached hits instead of querying
+Qdrant again.
+
+The similarity scan runs over compact keys: the first ``key_dims``
+components of each embedding (text-embedding-3 models are
+Matryoshka-trained, so a re-normalised prefix is itself a usable
+embedding), stored as int8 with a per-vector scale, so scanning the whole
+buffer is a single integer matrix-vector product over 256 bytes per entry.
+A prefix is less discriminative than the full embedding, though, so it only
+shortlists the closest few entries; ``threshold`` is then checked against
+the full-dimension cosine (full vectors are kept as int8 too, 3 KiB per
+entry at 3072 dims), which is the scale the 0.95 default was chosen for.
+
+Cached results go stale once new points are written to the collection, so
+ingest calls :func:`invalidate_all` after every upload; each cache empties
+itself on its next lookup.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Callable, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from retrieval.client import RetrievedChunk
+
+logger = logging.getLogger(__name__)
+
+# Entries shortlisted by prefix similarity and re-checked on full vectors
+_CANDIDATES = 4
+
+# Bumped by invalidate_all(); a cache built at an older generation is stale
+_generation = 0
+
+
+def invalidate_all() -> None:
+    """Mark every QVCache in the process stale (call after writing points)."""
+    global _generation
+    _generation += 1
+
+
+class QVCache:
+    """Ring buffer of (query embedding, search results) pairs."""
+
+    def __init__(
+        self,
+        dims: int,
+        capacity: int = 512,
+        threshold: float = 0.95,
+        key_dims: int = 256,
+    ) -> None:
+        self.threshold = threshold
+        self._dims = dims
+        self._key_dims = min(key_dims, dims)
+        self._capacity = capacity
+        self._keys = np.zeros((capacity, self._key_dims), dtype=np.int8)
+        self._scales = np.zeros(capacity, dtype=np.float32)
+        self._vectors = np.zeros((capacity, dims), dtype=np.int8)
+        self._vector_scales = np.zeros(capacity, dtype=np.float32)
+        self._results: list[Optional[list[RetrievedChunk]]] = [None] * capacity
+        self._limits = np.zeros(capacity, dtype=np.int32)
+        self._queries: list[Optional[str]] = [None] * capacity
+        self._slot_by_query: dict[str, int] = {}
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+        self._generation = _generation
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_search(
+        self,
+        queries: list[str],
+        limit: int,
+        embed_many: Callable[[list[str]], np.ndarray],
+        search_many: Callable[[np.ndarray], list[list[RetrievedChunk]]],
+    ) -> list[list[RetrievedChunk]]:
+        """
+        Return results for each query, from the cache where possible.
+
+        Args:
+            queries: Natural-language query texts.
+            limit: Number of results requested; only cache entries fetched
+                   with at least this limit can satisfy a lookup.
+            embed_many: Embeds a batch of query strings in one call (not
+                        called for exact repeats of a cached query).
+            search_many: Runs vector searches for a (n, dims) batch of
+                         normalised query vectors in one call.
+
+        Returns:
+            One result list per query, in input order.
+        """
+        results: list[Optional[list[RetrievedChunk]]] = [None] * len(queries)
+        unseen: list[int] = []
+        with self._lock:
+            if self._generation != _generation:
+                self._clear()
+            for i, q in enumerate(queries):
+                slot = self._slot_by_query.get(q)
+                if slot is not None and self._limits[slot] >= limit:
+                    results[i] = self._results[slot][:limit]
+                else:
+                    unseen.append(i)
+
+        misses: list[int] = []
+        if unseen:
+            vectors = self._normalise(embed_many([queries[i] for i in unseen]))
+            keys, scales = self._quantise(vectors[:, : self._key_dims])
+            full, full_scales = self._quantise(vectors)
+            with self._lock:
+                for j, i in enumerate(unseen):
+                    cached = self._lookup(keys[j], scales[j], full[j], full_scales[j], limit)
+                    if cached is None:
+                        misses.append(j)
+                    else:
+                        results[i] = cached[:limit]
+        self.hits += len(queries) - len(misses)
+        self.misses += len(misses)
+
+        if misses:
+            generation = _generation
+            fresh = search_many(vectors[misses])
+            with self._lock:
+                # Results of a search that raced an upload are not cached
+                if generation != _generation or self._generation != generation:
+                    for j, hits in zip(misses, fresh):
+                        results[unseen[j]] = hits
+                    return results
+                for j, hits in zip(misses, fresh):
+                    i = unseen[j]
+                    results[i] = hits
+                    self._insert(
+                        queries[i], keys[j], scales[j], full[j], full_scales[j], limit, hits
+                    )
+        return results
+
+    # ── internals ───────────────────────────────────────────────────────
+
+    def _clear(self) -> None:
+        self._results = [None] * self._capacity
+        self._queries = [None] * self._capacity
+        self._limits[:] = 0
+        self._slot_by_query.clear()
+        self._size = 0
+        self._next = 0
+        self._generation = _generation
+        logger.debug("Query cache cleared after a collection update")
+
+    @staticmethod
+    def _normalise(vectors: np.ndarray) -> np.ndarray:
+        arr = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(arr, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return arr / norms
+
+    @classmethod
+    def _quantise(cls, prefixes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Re-normalise embedding prefixes and quantise them to int8 + scale."""
+        unit = cls._normalise(prefixes)
+        scales = np.abs(unit).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        keys = np.rint(unit / scales[:, None]).astype(np.int8)
+        return keys, scales.astype(np.float32)
+
+    def _lookup(
+        self,
+        key: np.ndarray,
+        scale: float,
+        vector: np.ndarray,
+        vector_scale: float,
+        limit: int,
+    ) -> Optional[list[RetrievedChunk]]:
+        if self._size == 0:
+            return None
+        # int8 · int8 products accumulate in int32; rescale to cosine similarity
+        dots = self._keys[: self._size].astype(np.int32) @ key.astype(np.int32)
+        sims = dots * (self._scales[: self._size] * scale)
+        sims[self._limits[: self._size] < limit] = -np.inf
+        n = min(_CANDIDATES, self._size)
+        shortlist = np.argpartition(-sims, n - 1)[:n]
+        shortlist = shortlist[np.isfinite(sims[shortlist])]
+        if shortlist.size == 0:
+            return None
+        # The hit test itself uses the full-dimension cosine
+        full_dots = self._vectors[shortlist].astype(np.int32) @ vector.astype(np.int32)
+        full_sims = full_dots * (self._vector_scales[shortlist] * vector_scale)
+        best = int(np.argmax(full_sims))
+        if full_sims[best] < self.threshold:
+            return None
+        return self._results[int(shortlist[best])]
+
+    def _insert(
+        self,
+        query: str,
+        key: np.ndarray,
+        scale: float,
+        vector: np.ndarray,
+        vector_scale: float,
+        limit: int,
+        results: list[RetrievedChunk],
+    ) -> None:
+        slot = self._next
+        evicted = self._queries[slot]
+        if evicted is not None and self._slot_by_query.get(evicted) == slot:
+            del self._slot_by_query[evicted]
+        self._keys[slot] = key
+        self._scales[slot] = scale
+        self._vectors[slot] = vector
+        self._vector_scales[slot] = vector_scale
+        self._results[slot] = results
+        self._limits[slot] = limit
+        self._queries[slot] = query
+        self._slot_by_query[query] = slot
+        self._next = (slot + 1) % self._capacity
+        self._size = min(self._size + 1, self._capacity)
@@ -8,6 +8,8 @@ clinical / statistical terms encountered during retrieval.
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
 from dataclasses import dataclass
 from typing import Optional
@@ -37,6 +39,11 @@ class YouSearchClient:
             ydc_api_key=settings.ydc_api_key,
             num_web_results=3,
         )
+        self._max_concurrency = settings.ydc_max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # term -> definition, shared across all callers of this client
+        self._definitions: dict[str, str] = {}
+        self._inflight: dict[str, asyncio.Task[str]] = {}
 
     def search_term(self, term: str) -> list[WebSearchResult]:
         """
@@ -91,11 +98,54 @@ class YouSearchClient:
         """
         definitions: dict[str, str] = {}
         for term in terms:
-            results = self.search_term(term)
-            if results:
-                # Concatenate the top snippets into a definition
-                combined = " ".join(r.snippet for r in results[:2] if r.snippet)
-                definitions[term] = combined
-            else:
-                definitions[term] = f"No definition found for '{term}'."
+            if term not in self._definitions:
+                self._definitions[term] = self._define(term)
+            definitions[term] = self._definitions[term]
         return definitions
+
+    async def hydrate_terms_async(self, terms: list[str]) -> dict[str, str]:
+        """
+        Concurrent variant of hydrate_terms for use inside the async graph.
+
+        Terms are looked up in parallel (at most ``ydc_max_concurrency`` at
+        once).  Definitions are memoised on the client, and a term already
+        being looked up by another caller is awaited rather than re-fetched,
+        so a term flagged by several CONSORT items costs one request.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        tasks: dict[str, asyncio.Task[str]] = {}
+        for term in dict.fromkeys(terms):
+            if term in self._definitions:
+                continue
+            if term not in self._inflight:
+                task = asyncio.create_task(self._define_async(term))
+                task.add_done_callback(functools.partial(self._settle, term))
+                self._inflight[term] = task
+            tasks[term] = self._inflight[term]
+
+        definitions = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+        return {term: definitions.get(term, self._definitions.get(term, "")) for term in terms}
+
+    # ── internals ───────────────────────────────────────────────────────
+
+    def _define(self, term: str) -> str:
+        """Search for *term* and condense the top snippets into a definition."""
+        results = self.search_term(term)
+        if results:
+            # Concatenate the top snippets into a definition
+            return " ".join(r.snippet for r in results[:2] if r.snippet)
+        return f"No definition found for '{term}'."
+
+    def _settle(self, term: str, task: asyncio.Task[str]) -> None:
+        # Runs however the lookup ended, so a cancelled or failed term is
+        # retried by the next caller; only successful lookups are memoised
+        self._inflight.pop(term, None)
+        if not task.cancelled() and task.exception() is None:
+            self._definitions[term] = task.result()
+
+    async def _define_async(self, term: str) -> str:
+        # The LangChain wrapper is synchronous; run it in a worker thread
+        async with self._semaphore:
+            return await asyncio.to_thread(self._define, term)
@@ -15,24 +15,28 @@ Start with:
 from __future__ import annotations
 
 import asyncio
+import io
 import json
 import logging
 import shutil
 import tempfile
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any
 
-from fastapi import FastAPI, File, HTTPException, UploadFile
+import aiofiles
+import msgspec
+from fastapi import Depends, FastAPI, File, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # ── Agent-internal imports ────────────────────────────────────────────
-from config import get_settings, Settings
+from config import Settings, aclose_async_clients, get_openai, get_settings, get_you_client
 from ingest.chunker import chunk_documents
-from ingest.uploader import upload_chunks
+from ingest.uploader import indexing_paused, upload_chunks_async
 from search.you_client import YouSearchClient
-from agent.graph import build_graph, create_initial_state
+from agent.graph import build_graph, clear_draft_checkpoints, create_initial_state
 
 logging.basicConfig(
     level=logging.INFO,
@@ -41,11 +45,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_UPLOAD_CHUNK_BYTES = 1 << 20
+_SUMMARY_INPUT_CHARS = 3000  # document prefix sent to the summariser
+
 # ── FastAPI app ──────────────────────────────────────────────────────
 
+@asynccontextmanager
+async def _lifespan(_: FastAPI):
+    yield
+    await aclose_async_clients()
+
+
 app = FastAPI(
     title="CONSORT Deep Research Agent API",
     description="HTTP bridge between the React UI and the LangGraph agent",
+    lifespan=_lifespan,
 )
 
 app.add_middleware(
@@ -132,17 +146,34 @@ def _load_file_as_docs(path: Path) -> list[dict[str, Any]]:
                 "source_file": path.name,
                 "file_type": suffix.lstrip("."),
                 "page_number": 1,
+                "citation": f"[{path.name} p.1]",
             },
         }
     ]
 
 
+def _head(docs: list[dict[str, Any]], limit: int) -> str:
+    """
+    Return the first *limit* characters of the space-joined document texts
+    without materialising the whole joined string.
+    """
+    buf = io.StringIO()
+    size = 0
+    for i, doc in enumerate(docs):
+        if i:
+            buf.write(" ")
+            size += 1
+        text = doc["text"][: max(limit - size, 0)]
+        buf.write(text)
+        size += len(text)
+        if size >= limit:
+            break
+    return buf.getvalue()[:limit]
+
+
 def _summarise_text(text: str, settings: Settings) -> str:
     """Ask the LLM for a 2-3 sentence summary of *text*."""
-    from openai import OpenAI
-
-    oai = OpenAI(api_key=settings.openai_api_key)
-    resp = oai.chat.completions.create(
+    resp = get_openai().chat.completions.create(
         model=settings.llm_model,
         messages=[
             {
@@ -154,7 +185,7 @@ def _summarise_text(text: str, settings: Settings) -> str:
             },
             {
                 "role": "user",
-                "content": f"Summarise this clinical trial document:\n\n{text[:3000]}",
+                "content": f"Summarise this clinical trial document:\n\n{text}",
             },
         ],
         max_completion_tokens=512,
@@ -163,9 +194,81 @@ def _summarise_text(text: str, settings: Settings) -> str:
     return (resp.choices[0].message.content or "").strip()
 
 
-def _sse(data: dict) -> str:
-    """Format a dict as a Server-Sent Events ``data:`` frame."""
-    return f"data: {json.dumps(data)}\n\n"
+async def _file_snippets(fpath: Path, you: YouSearchClient, file_out: FileSummaryOut) -> None:
+    """Attach You.com research snippets for *fpath* to *file_out* (best-effort)."""
+    try:
+        query = f"{fpath.stem} clinical trial"
+        file_out.query = query
+        results = await asyncio.to_thread(you.search_term, fpath.stem)
+        file_out.snippets = [
+            SnippetOut(title=r.title, description=r.snippet, url=r.url)
+            for r in results[:3]
+        ]
+    except Exception as exc:
+        logger.warning("You.com search failed for %s: %s", fpath.name, exc)
+        file_out.snippets = []
+
+
+async def _process_one(
+    fpath: Path,
+    settings: Settings,
+    you: YouSearchClient,
+    semaphore: asyncio.Semaphore,
+) -> tuple[FileSummaryOut, int]:
+    """
+    Load → chunk → embed/upsert one file, summarising it and fetching
+    snippets alongside the upload.  Returns the summary and points stored.
+    """
+    file_out = FileSummaryOut(filename=fpath.name, summary="")
+    async with semaphore:
+        try:
+            documents = await asyncio.to_thread(_load_file_as_docs, fpath)
+            if not documents:
+                file_out.summary = "File was empty or could not be loaded."
+                file_out.error = "No content extracted."
+                return file_out, 0
+
+            # Chunk
+            chunks = await asyncio.to_thread(
+                chunk_documents, documents, chunk_size=1000, chunk_overlap=200
+            )
+
+            # Embed & upload, LLM summary and You.com snippets are independent
+            head = _head(documents, _SUMMARY_INPUT_CHARS)
+            n_up, file_out.summary, _ = await asyncio.gather(
+                upload_chunks_async(chunks, settings),
+                asyncio.to_thread(_summarise_text, head, settings),
+                _file_snippets(fpath, you, file_out),
+            )
+            return file_out, n_up
+
+        except Exception as exc:
+            logger.exception("Error processing %s", fpath.name)
+            file_out.error = str(exc)
+            file_out.summary = f"Error processing file: {exc}"
+            return file_out, 0
+
+
+_compiled_graph: Any | None = None
+_compile_lock = asyncio.Lock()
+
+
+async def _get_compiled_graph() -> Any:
+    """Compile the research graph once and reuse it for every request."""
+    global _compiled_graph
+    if _compiled_graph is None:
+        async with _compile_lock:
+            if _compiled_graph is None:
+                _compiled_graph = build_graph().compile()
+    return _compiled_graph
+
+
+_json_encode = msgspec.json.Encoder().encode
+
+
+def _sse(data: dict) -> bytes:
+    """Format a dict as a Server-Sent Events ``data:`` frame (UTF-8 bytes)."""
+    return b"data: " + _json_encode(data) + b"\n\n"
 
 
 # ── Endpoints ────────────────────────────────────────────────────────
@@ -178,7 +281,10 @@ async def health():
 
 
 @app.post("/api/process", response_model=ProcessResult)
-async def process_files(files: list[UploadFile] = File(...)):
+async def process_files(
+    files: list[UploadFile] = File(...),
+    you: YouSearchClient = Depends(get_you_client),
+):
     """
     1. Save uploaded files to a temp directory.
     2. Load → chunk → embed → upsert into Qdrant.
@@ -196,53 +302,22 @@ async def process_files(files: list[UploadFile] = File(...)):
         saved_paths: list[Path] = []
         for upload in files:
             dest = tmp_dir / (upload.filename or "unknown")
-            dest.write_bytes(await upload.read())
+            # Stream to disk in 1 MiB pieces instead of buffering the whole file
+            async with aiofiles.open(dest, "wb") as out:
+                while piece := await upload.read(_UPLOAD_CHUNK_BYTES):
+                    await out.write(piece)
             saved_paths.append(dest)
 
-        # ── Process each file ─────────────────────────────────────────
-        for fpath in saved_paths:
-            file_out = FileSummaryOut(filename=fpath.name, summary="")
-            try:
-                documents = _load_file_as_docs(fpath)
-                if not documents:
-                    file_out.summary = "File was empty or could not be loaded."
-                    file_out.error = "No content extracted."
-                    summaries.append(file_out)
-                    continue
-
-                # Chunk
-                chunks = chunk_documents(documents, chunk_size=1000, chunk_overlap=200)
-
-                # Embed & upload (potentially slow – run in a thread)
-                n_up = await asyncio.to_thread(upload_chunks, chunks, settings)
-                total_points += n_up
-
-                # Summarise via LLM
-                full_text = " ".join(d["text"] for d in documents)
-                file_out.summary = await asyncio.to_thread(
-                    _summarise_text, full_text, settings
-                )
-
-                # You.com snippets (best-effort)
-                try:
-                    you = YouSearchClient(settings)
-                    query = f"{fpath.stem} clinical trial"
-                    file_out.query = query
-                    results = await asyncio.to_thread(you.search_term, fpath.stem)
-                    file_out.snippets = [
-                        SnippetOut(title=r.title, description=r.snippet, url=r.url)
-                        for r in results[:3]
-                    ]
-                except Exception as exc:
-                    logger.warning("You.com search failed for %s: %s", fpath.name, exc)
-                    file_out.snippets = []
-
-            except Exception as exc:
-                logger.exception("Error processing %s", fpath.name)
-                file_out.error = str(exc)
-                file_out.summary = f"Error processing file: {exc}"
-
+        # ── Process files concurrently ────────────────────────────────
+        # Indexing stays off until every file of the request is written
+        semaphore = asyncio.Semaphore(settings.file_concurrency)
+        async with indexing_paused(settings):
+            results = await asyncio.gather(
+                *[_process_one(fpath, settings, you, semaphore) for fpath in saved_paths]
+            )
+        for file_out, n_up in results:
             summaries.append(file_out)
+            total_points += n_up
     finally:
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
@@ -276,8 +351,7 @@ async def generate_report():
                 "progress": 0,
             })
 
-            graph = build_graph()
-            compiled = graph.compile()
+            compiled = await _get_compiled_graph()
             initial_state = create_initial_state(settings.consort_json_path)
             total = len(initial_state["consort_items"])
 
@@ -288,13 +362,14 @@ async def generate_report():
                 "total": total,
             })
 
-            # Heavy work – run in a thread so we don't block the event loop
-            final_state = await asyncio.to_thread(compiled.invoke, initial_state)
+            # Nodes are async, so the graph runs on the server's event loop
+            final_state = await compiled.ainvoke(initial_state)
 
             latex = final_state.get("final_latex", "")
             if not latex:
                 yield _sse({"type": "error", "message": "Agent finished but produced no LaTeX."})
                 return
+            clear_draft_checkpoints()
 
             yield _sse({
                 "type": "complete",
@@ -324,10 +399,7 @@ async def chat(body: ChatRequest):
     settings = get_settings()
 
     try:
-        from openai import OpenAI
-
-        oai = OpenAI(api_key=settings.openai_api_key)
-        resp = oai.chat.completions.create(
+        resp = get_openai().chat.completions.create(
             model=settings.llm_model,
             response_format={"type": "json_object"},
             messages=[
@@ -0,0 +1,59 @@
+"""QVCache hit/miss behaviour on synthetic embeddings."""
+
+import numpy as np
+
+from retrieval.qvcache import QVCache
+
+DIMS = 3072
+KEY_DIMS = 256
+
+
+def _unit(v: np.ndarray) -> np.ndarray:
+    return v / np.linalg.norm(v)
+
+
+def _cache_with(vectors: dict[str, np.ndarray]):
+    cache = QVCache(DIMS, capacity=8, threshold=0.95, key_dims=KEY_DIMS)
+    searches: list[int] = []
+
+    def embed_many(queries):
+        return np.stack([vectors[q] for q in queries])
+
+    def search_many(batch):
+        searches.append(len(batch))
+        return [[f"hit-{len(searches)}-{j}"] for j in range(len(batch))]
+
+    def lookup(query):
+        return cache.get_or_search([query], 5, embed_many, search_many)[0]
+
+    return lookup, searches
+
+
+def test_near_duplicate_query_hits():
+    rng = np.random.default_rng(0)
+    base = _unit(rng.standard_normal(DIMS))
+    near = _unit(base + 0.05 * _unit(rng.standard_normal(DIMS)))
+    lookup, searches = _cache_with(
+        {"randomization procedure": base, "randomisation method": near}
+    )
+
+    first = lookup("randomization procedure")
+    assert lookup("randomisation method") == first
+    assert searches == [1]
+
+
+def test_distinct_query_sharing_prefix_misses():
+    rng = np.random.default_rng(1)
+    base = _unit(rng.standard_normal(DIMS))
+    # Same leading dimensions (so the prefix keys match) but a different tail
+    other = base.copy()
+    tail = rng.standard_normal(DIMS - KEY_DIMS)
+    other[KEY_DIMS:] = tail * np.linalg.norm(base[KEY_DIMS:]) / np.linalg.norm(tail)
+    other = _unit(other)
+    lookup, searches = _cache_with(
+        {"allocation concealment": base, "blinding of outcome assessors": other}
+    )
+
+    first = lookup("allocation concealment")
+    assert lookup("blinding of outcome assessors") != first
+    assert searches == [1, 1]
@@ -14,14 +14,8 @@ import argparse
 import logging
 import sys
 
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    pass
-
-from data_generator.config import Config, SUPPORTED_MODELS
-from data_generator.orchestrator import run
+# Only the stdlib is imported at module level so that --help stays fast;
+# the generator (openai, httpx, tiktoken, ...) is imported in main().
 
 logging.basicConfig(
     level=logging.INFO,
@@ -30,7 +24,25 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _epilog() -> str:
+    """Help epilog listing the supported models (config needs only stdlib and dotenv)."""
+    from data_generator.config import SUPPORTED_MODELS
+
+    return (
+        "Supported models:\n"
+        + "\n".join(f"  {m}" for m in SUPPORTED_MODELS)
+        + "\n\nGPT-5.2 specs:\n"
+        "  Context window:   400,000 tokens\n"
+        "  Max output:       128,000 tokens\n"
+        "  Pricing:          $1.75/1M input, $14.00/1M output\n"
+        "  Reasoning effort: none (default), low, medium, high, xhigh\n"
+        "\nRef: https://platform.openai.com/docs/models/gpt-5.2"
+    )
+
+
 def main() -> int:
+    from data_generator.config import SUPPORTED_MODELS
+
     parser = argparse.ArgumentParser(
         description=(
             "Generate Minimal Viable Dataset (100-150 pp per trial) for "
@@ -38,16 +50,7 @@ def main() -> int:
             "Uses GPT-5.2 by default (https://platform.openai.com/docs/models/gpt-5.2)."
         ),
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog=(
-            "Supported models:\n"
-            + "\n".join(f"  {m}" for m in SUPPORTED_MODELS)
-            + "\n\nGPT-5.2 specs:\n"
-            "  Context window:   400,000 tokens\n"
-            "  Max output:       128,000 tokens\n"
-            "  Pricing:          $1.75/1M input, $14.00/1M output\n"
-            "  Reasoning effort: none (default), low, medium, high, xhigh\n"
-            "\nRef: https://platform.openai.com/docs/models/gpt-5.2"
-        ),
+        epilog=_epilog(),
     )
     parser.add_argument(
         "--out",
@@ -115,16 +118,83 @@ def main() -> int:
     parser.add_argument(
         "--delay",
         type=float,
-        default=1.0,
-        help="Delay between API calls in seconds (default: 1.0)",
+        default=0.0,
+        help=(
+            "Minimum wait in seconds before retrying a rate-limited (429) call "
+            "that carries no Retry-After header (default: 0.0)"
+        ),
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=6,
+        help="Max concurrent section requests per document (default: 6)",
+    )
+    parser.add_argument(
+        "--trial-concurrency",
+        type=int,
+        default=2,
+        help="Number of trials generated concurrently (default: 2)",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=None,
+        help="Client-side requests-per-minute budget (default: unlimited)",
+    )
+    parser.add_argument(
+        "--tpm",
+        type=int,
+        default=None,
+        help=(
+            "Client-side tokens-per-minute budget, counting prompt tokens "
+            "plus max completion tokens per call (default: unlimited)"
+        ),
+    )
+    parser.add_argument(
+        "--use-batch-api",
+        action="store_true",
+        help=(
+            "Submit all sections as one OpenAI Batch API job (50%% cheaper, "
+            "results within 24h) instead of live Chat Completions calls"
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default="~/.cache/clinirep_gen",
+        help=(
+            "Directory for cached section responses, keyed by request hash "
+            "(default: ~/.cache/clinirep_gen)"
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the section response cache",
+    )
+    parser.add_argument(
+        "--single-shot-per-doc",
+        action="store_true",
+        help=(
+            "Generate all sections of a document in one structured-output "
+            "(JSON schema) call instead of one call per section"
+        ),
     )
     args = parser.parse_args()
 
+    from data_generator.config import Config
+
     config = Config(
         output_dir=args.out,
         model=args.model,
         max_completion_tokens=args.max_completion_tokens,
         delay_between_calls_sec=args.delay,
+        max_concurrency=args.max_concurrency,
+        trial_concurrency=args.trial_concurrency,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        single_shot_per_doc=args.single_shot_per_doc,
         checkpoint_path=f"{args.out}/checkpoint.json",
     )
     resume = args.resume and not args.no_resume
@@ -137,7 +207,11 @@ def main() -> int:
     )
 
     try:
-        result = run(
+        if args.use_batch_api:
+            from data_generator.batch_api import run_batch as run_fn
+        else:
+            from data_generator.orchestrator import run as run_fn
+        result = run_fn(
             output_dir=args.out,
             num_trials=args.trials,
             resume=resume,
@@ -0,0 +1,248 @@
+"""Offline generation through the OpenAI Batch API.
+
+Instead of one live Chat Completions call per section, every section of
+every pending trial is submitted as a single batch job (50% of the
+real-time price, a separate and much larger rate-limit pool, results
+within 24h).  Ref: https://platform.openai.com/docs/guides/batch
+
+Flow: write one JSONL request line per (trial, document, section), upload
+it with ``purpose="batch"``, create the batch, poll until it finishes,
+download the output file, and demux the completions by ``custom_id`` back
+into per-trial documents.  Sections already in the response cache are
+left out of the batch, and sections the batch could not produce are
+regenerated live with ``generate_section``.
+
+The batch id is saved next to the checkpoint, so re-running with
+``--resume`` after an interruption keeps polling the same job instead of
+submitting (and paying for) a new one.
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import msgspec
+from openai import OpenAI
+
+from data_generator.builders import DOC_SPECS, _write_document
+from data_generator.checkpoint import load_checkpoint, save_checkpoint
+from data_generator.config import Config
+from data_generator.openai_client import (
+    _build_api_kwargs,
+    _build_messages,
+    generate_section,
+)
+from data_generator.orchestrator import _prepare_trial_dir
+from data_generator.response_cache import ResponseCache, cache_key, open_response_cache
+from data_generator.trial_context import get_trial_context
+
+logger = logging.getLogger(__name__)
+
+BATCH_STATE_FILENAME = "batch_state.json"
+BATCH_INPUT_FILENAME = "batch_input.jsonl"
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _custom_id(trial_id: str, doc_type: str, index: int) -> str:
+    # Section index, not heading: headings contain spaces and slashes
+    return f"{trial_id}/{doc_type}/{index:02d}"
+
+
+def write_batch_input(
+    path: Path,
+    trials: Dict[str, Dict[str, Any]],
+    config: Config,
+    reasoning_effort: Optional[str] = None,
+    cache: Optional[ResponseCache] = None,
+) -> int:
+    """Write one Batch API request line per uncached section of every trial.
+
+    Returns the number of requests written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for trial_id, trial_context in trials.items():
+            for doc_type, sections in DOC_SPECS.items():
+                for i, section in enumerate(sections):
+                    messages = _build_messages(doc_type, section, trial_context)
+                    body = _build_api_kwargs(config, messages, reasoning_effort)
+                    if cache is not None and cache.lookup(cache_key(body)) is not None:
+                        continue
+                    line = {
+                        "custom_id": _custom_id(trial_id, doc_type, i),
+                        "method": "POST",
+                        "url": BATCH_ENDPOINT,
+                        "body": body,
+                    }
+                    f.write(json.dumps(line) + "\n")
+                    n += 1
+    return n
+
+
+def _load_batch_state(output_dir: Path) -> Optional[Dict[str, Any]]:
+    path = output_dir / BATCH_STATE_FILENAME
+    if not path.exists():
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning("Could not load batch state: %s", e)
+        return None
+
+
+def _save_batch_state(output_dir: Path, batch_id: str, trial_indices: List[int]) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    with open(output_dir / BATCH_STATE_FILENAME, "w") as f:
+        json.dump({"batch_id": batch_id, "trial_indices": trial_indices}, f, indent=2)
+
+
+def _submit_batch(client: OpenAI, input_path: Path) -> str:
+    with open(input_path, "rb") as f:
+        input_file = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    logger.info("Submitted batch %s (input file %s)", batch.id, input_file.id)
+    return batch.id
+
+
+def _wait_for_batch(client: OpenAI, batch_id: str, poll_interval_sec: float) -> Any:
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        logger.info(
+            "Batch %s: %s (%s/%s done, %s failed)",
+            batch_id,
+            batch.status,
+            counts.completed if counts else "?",
+            counts.total if counts else "?",
+            counts.failed if counts else "?",
+        )
+        if batch.status in TERMINAL_STATUSES:
+            return batch
+        time.sleep(poll_interval_sec)
+
+
+def parse_batch_output(text: str) -> Dict[str, str]:
+    """Map custom_id -> completion text for every successful line of a batch output."""
+    results: Dict[str, str] = {}
+    for raw in text.splitlines():
+        if not raw.strip():
+            continue
+        line = msgspec.json.decode(raw)
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            logger.warning("Batch request %s failed: %s", line.get("custom_id"), line.get("error"))
+            continue
+        choices = response.get("body", {}).get("choices") or []
+        content = (choices[0].get("message", {}).get("content") or "").strip() if choices else ""
+        if content:
+            results[line["custom_id"]] = content
+    return results
+
+
+def run_batch(
+    output_dir: str = "synthetic_output",
+    num_trials: int = 1,
+    resume: bool = True,
+    start_index: int = 0,
+    seed: Optional[int] = None,
+    config: Optional[Config] = None,
+    reasoning_effort: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Batch API counterpart of :func:`data_generator.orchestrator.run`.
+
+    Same arguments, outputs, checkpoint and return value; blocks until the
+    batch finishes (polling every config.batch_poll_interval_sec).
+    """
+    config = config or Config()
+    output_path = Path(output_dir)
+    checkpoint = load_checkpoint(output_path) if resume else {}
+    trials_done = checkpoint.get("trials_done", [])
+    total_words = checkpoint.get("total_words", 0)
+    client = OpenAI(api_key=config.api_key)
+    cache = open_response_cache(config)
+
+    indices = [
+        i
+        for i in range(start_index, start_index + num_trials)
+        if f"trial_{i+1:03d}" not in trials_done
+    ]
+    if not indices:
+        logger.info("All requested trials already done")
+    else:
+        state = _load_batch_state(output_path) if resume else None
+        # A crash during demux leaves some of the batch's trials done; the
+        # rest are still covered by the same (already paid for) batch
+        if state and set(indices) <= set(state.get("trial_indices", [])):
+            batch_id = state["batch_id"]
+            logger.info("Resuming batch %s for %s pending trials", batch_id, len(indices))
+        else:
+            trials = {
+                f"trial_{i+1:03d}": get_trial_context(i, seed=seed) for i in indices
+            }
+            input_path = output_path / BATCH_INPUT_FILENAME
+            n = write_batch_input(input_path, trials, config, reasoning_effort, cache)
+            logger.info("Wrote %s batch requests for %s trials", n, len(trials))
+            batch_id = _submit_batch(client, input_path) if n else None
+            if batch_id:
+                _save_batch_state(output_path, batch_id, indices)
+
+        results: Dict[str, str] = {}
+        if batch_id:
+            batch = _wait_for_batch(client, batch_id, config.batch_poll_interval_sec)
+            if batch.output_file_id:
+                results = parse_batch_output(client.files.content(batch.output_file_id).text)
+            if batch.status != "completed":
+                logger.warning("Batch %s ended as %s", batch_id, batch.status)
+
+        for i in indices:
+            trial_id = f"trial_{i+1:03d}"
+            trial_context = get_trial_context(i, seed=seed)
+            trial_dir = _prepare_trial_dir(output_path, trial_id, trial_context)
+            words = 0
+            for doc_type, sections in DOC_SPECS.items():
+                parts = []
+                for j, section in enumerate(sections):
+                    text = results.get(_custom_id(trial_id, doc_type, j))
+                    if text is not None and cache is not None:
+                        messages = _build_messages(doc_type, section, trial_context)
+                        body = _build_api_kwargs(config, messages, reasoning_effort)
+                        cache.store_text(cache_key(body), text)
+                    if text is None:
+                        # Cached sections were left out of the batch; this
+                        # reads them back, or regenerates failed ones live
+                        text = generate_section(
+                            doc_type,
+                            section,
+                            trial_context,
+                            config=config,
+                            client=client,
+                            reasoning_effort=reasoning_effort,
+                        )
+                    parts.append(text)
+                words += _write_document(trial_dir / f"{doc_type}.txt", parts)
+            total_words += words
+            trials_done.append(trial_id)
+            save_checkpoint(output_path, trials_done, total_words, trial_id)
+            logger.info(
+                "Trial %s done: %s words (%s pages total so far)",
+                trial_id,
+                words,
+                total_words // config.words_per_page,
+            )
+        (output_path / BATCH_STATE_FILENAME).unlink(missing_ok=True)
+
+    return {
+        "trials_done": trials_done,
+        "total_words": total_words,
+        "total_pages": total_words // config.words_per_page,
+    }
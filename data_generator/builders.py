@@ -1,96 +1,381 @@
 """Build Protocol, SAP, and Summary Tables documents by concatenating generated sections.
 
-Each builder calls generate_section() for each defined section, forwarding
-the GPT-5.2 reasoning_effort parameter when provided.
+All three documents go through one builder, build_document, parameterized
+by the DOC_SPECS table of section lists.  Sections of a document do not
+depend on one another, so the builder sends its section requests
+concurrently on one AsyncOpenAI client (at most Config.max_concurrency in
+flight, to stay under the RPM/TPM limits), forwarding the GPT-5.2
+reasoning_effort parameter when provided.
+
+Responses are streamed: each section is written to its own part file
+(``<output>.parts/NN.txt``) as tokens arrive, and the finished parts are
+copied into the output file in section order, so no full document is ever
+held in memory.
+
+Given a checkpoint directory (the orchestrator passes the run's output
+directory), progress is recorded per section under the trial id in its
+``checkpoint.json`` (see data_generator.checkpoint), fsync'd after each
+section completes.  A crashed run then resumes from the missing sections
+of the unfinished document, and a document that was already assembled is
+not regenerated.  Without one, nothing is reused.  The public
+build_* functions are synchronous wrappers; build_protocol, build_sap and
+build_summary_tables are kept as shorthands for build_document.
 """
 
+import asyncio
 import logging
+import shutil
+import warnings
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
-from data_generator.config import Config
+from data_generator.checkpoint import load_section_progress, save_section_progress
+from data_generator.config import GPT_5_2_MAX_OUTPUT_TOKENS, Config
 from data_generator.consort_sections import (
     PROTOCOL_SECTIONS,
     SAP_SECTIONS,
     SUMMARY_TABLE_SECTIONS,
+    SectionSpec,
 )
-from data_generator.openai_client import generate_section
+from data_generator.openai_client import (
+    _agenerate_document,
+    _astream_section,
+    _document_output_tokens,
+    _make_async_client,
+)
+from data_generator.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Sections of each document of a trial, in output order; each document is
+# written to <doc_type>.txt in the trial directory
+DOC_SPECS: Dict[str, List[SectionSpec]] = {
+    "protocol": PROTOCOL_SECTIONS,
+    "sap": SAP_SECTIONS,
+    "summary_tables": SUMMARY_TABLE_SECTIONS,
+}
 
-def build_protocol(
+
+def _doc_sections(doc_type: str) -> List[SectionSpec]:
+    if doc_type not in DOC_SPECS:
+        raise ValueError(f"Unknown doc_type: {doc_type}")
+    return DOC_SPECS[doc_type]
+
+
+def _load_progress(checkpoint_dir: Optional[Path], trial_id: str) -> Dict[str, Any]:
+    """Section progress of *trial_id* from the run checkpoint ({} without one)."""
+    if checkpoint_dir is None:
+        return {}
+    return load_section_progress(checkpoint_dir, trial_id)
+
+
+def _save_progress(
+    checkpoint_dir: Optional[Path], trial_id: str, progress: Dict[str, Any]
+) -> None:
+    if checkpoint_dir is not None:
+        save_section_progress(checkpoint_dir, trial_id, progress)
+
+
+def _completed_words(
+    output_path: Path, doc_type: str, checkpoint_dir: Optional[Path], trial_id: str
+) -> Optional[int]:
+    """Word count of an already-assembled document, or None if it must be built."""
+    words = _load_progress(checkpoint_dir, trial_id).get(doc_type, {}).get("words")
+    if words is None or not output_path.exists():
+        return None
+    logger.info("%s already complete (%s words); skipping", output_path, words)
+    return words
+
+
+def _write_document(output_path: Path, parts: Sequence[str]) -> int:
+    """Join section texts, write the document, and return its word count."""
+    full = "\n\n".join(parts)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(full, encoding="utf-8")
+    return len(full.split())
+
+
+@asynccontextmanager
+async def _client_scope(
+    config: Config,
+    aclient: Optional[AsyncOpenAI],
+) -> AsyncIterator[AsyncOpenAI]:
+    """Yield *aclient* if given, else a client of our own that is closed on exit."""
+    if aclient is not None:
+        yield aclient
+        return
+    async with _make_async_client(config) as own:
+        yield own
+
+
+def _warn_client_ignored(client: Optional[OpenAI]) -> None:
+    """Sections are generated on an internal AsyncOpenAI; a sync client is unused."""
+    if client is not None:
+        warnings.warn(
+            "the client argument is ignored and will be removed",
+            DeprecationWarning,
+            stacklevel=3,
+        )
+
+
+def _parts_dir(output_path: Path) -> Path:
+    return output_path.with_name(output_path.name + ".parts")
+
+
+def _assemble_document(
     output_path: Path,
-    trial_context: Optional[Dict[str, Any]] = None,
+    doc_type: str,
+    part_paths: Sequence[Path],
+    checkpoint_dir: Optional[Path],
+    trial_id: str,
+) -> int:
+    """Copy part files into output_path line by line; returns the word count.
+
+    Equivalent to writing ``"\n\n".join(parts)`` but holding one line at a
+    time.  The document is then marked complete in the checkpoint and
+    the parts directory is removed.
+    """
+    words = 0
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as out:
+        for i, part_path in enumerate(part_paths):
+            if i:
+                out.write("\n\n")
+            with open(part_path, encoding="utf-8") as f:
+                for line in f:
+                    words += len(line.split())
+                    out.write(line)
+    progress = _load_progress(checkpoint_dir, trial_id)
+    progress.setdefault(doc_type, {})["words"] = words
+    _save_progress(checkpoint_dir, trial_id, progress)
+    shutil.rmtree(_parts_dir(output_path), ignore_errors=True)
+    return words
+
+
+async def _gather_sections(
+    doc_type: str,
+    sections: Sequence[SectionSpec],
+    trial_context: Optional[Dict[str, Any]],
+    config: Config,
+    aclient: AsyncOpenAI,
+    output_path: Path,
+    reasoning_effort: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+    checkpoint_dir: Optional[Path] = None,
+    trial_id: str = "trial_001",
+) -> List[Path]:
+    """Stream *sections* into part files, at most config.max_concurrency in flight.
+
+    With a checkpoint_dir, sections whose index is listed in its checkpoint
+    under trial_id (with their part file on disk) are reused, and the index
+    of each newly finished section is added to it.  With
+    config.single_shot_per_doc, the missing sections are generated in one
+    structured-output call instead, if they fit GPT-5.2's output limit.
+    """
+    parts_dir = _parts_dir(output_path)
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    progress = _load_progress(checkpoint_dir, trial_id)
+    completed = progress.setdefault(doc_type, {}).setdefault("completed_sections", [])
+    part_paths = [parts_dir / f"{i:02d}.txt" for i in range(len(sections))]
+
+    def _reusable(i: int) -> bool:
+        return i in completed and part_paths[i].exists()
+
+    def _record(i: int) -> None:
+        # A listed section whose part file went missing is regenerated
+        # without being listed twice
+        if i not in completed:
+            completed.append(i)
+
+    if config.single_shot_per_doc:
+        todo = [i for i in range(len(sections)) if not _reusable(i)]
+        todo_sections = [sections[i] for i in todo]
+        if _document_output_tokens(todo_sections) <= GPT_5_2_MAX_OUTPUT_TOKENS:
+            if todo:
+                texts = await _agenerate_document(
+                    doc_type,
+                    todo_sections,
+                    trial_context,
+                    config,
+                    aclient,
+                    reasoning_effort,
+                    limiter,
+                )
+                for i, text in zip(todo, texts):
+                    part_paths[i].write_text(text, encoding="utf-8")
+                    _record(i)
+                _save_progress(checkpoint_dir, trial_id, progress)
+            return part_paths
+        logger.warning(
+            "%s is too long for one response (~%s tokens); generating per section",
+            doc_type,
+            _document_output_tokens(todo_sections),
+        )
+
+    sem = asyncio.Semaphore(config.max_concurrency)
+
+    async def _bound(i: int, section: SectionSpec) -> Path:
+        part_path = part_paths[i]
+        if _reusable(i):
+            logger.info("Reusing completed section '%s'", section.heading)
+            return part_path
+        async with sem:
+            await _astream_section(
+                doc_type,
+                section,
+                trial_context,
+                config,
+                aclient,
+                part_path,
+                reasoning_effort,
+                limiter,
+            )
+        _record(i)
+        _save_progress(checkpoint_dir, trial_id, progress)
+        return part_path
+
+    # Let in-flight sections finish (and be recorded) even if one fails
+    results = await asyncio.gather(
+        *[_bound(i, section) for i, section in enumerate(sections)],
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def _abuild_document(
+    doc_type: str,
+    output_path: Path,
+    trial_context: Optional[Dict[str, Any]],
+    config: Config,
+    reasoning_effort: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+    aclient: Optional[AsyncOpenAI] = None,
+    sections: Optional[Sequence[SectionSpec]] = None,
+    checkpoint_dir: Optional[Path] = None,
     trial_id: str = "trial_001",
+) -> int:
+    if sections is None:
+        sections = _doc_sections(doc_type)
+    words = _completed_words(output_path, doc_type, checkpoint_dir, trial_id)
+    if words is not None:
+        return words
+    logger.info("%s: generating %s sections", doc_type, len(sections))
+    async with _client_scope(config, aclient) as client:
+        parts = await _gather_sections(
+            doc_type,
+            sections,
+            trial_context,
+            config,
+            client,
+            output_path,
+            reasoning_effort,
+            limiter,
+            checkpoint_dir,
+            trial_id,
+        )
+    return _assemble_document(output_path, doc_type, parts, checkpoint_dir, trial_id)
+
+
+def build_document(
+    doc_type: str,
+    output_path: Path,
+    trial_context: Optional[Dict[str, Any]] = None,
     config: Optional[Config] = None,
-    client: Optional[OpenAI] = None,
+    *,
     reasoning_effort: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+    sections: Optional[Sequence[SectionSpec]] = None,
+    trial_id: str = "trial_001",
+    checkpoint_dir: Optional[Path] = None,
 ) -> int:
     """
-    Generate Protocol (60-80 pp) and write to output_path.
+    Generate one document (a key of DOC_SPECS) and write to output_path.
 
     Args:
+        sections: Sections to generate (default: DOC_SPECS[doc_type]).
         reasoning_effort: Optional GPT-5.2 reasoning effort level.
+        limiter: Optional RateLimiter shared across documents.
+        trial_id: Key of this trial's section progress in the checkpoint.
+        checkpoint_dir: Directory of the checkpoint.json to resume from and
+                        record progress in.  Without it every section is
+                        generated afresh and nothing is recorded.
 
     Returns total word count.
     """
     config = config or Config()
-    client = client or OpenAI(api_key=config.api_key)
-    parts = []
-    for i, section in enumerate(PROTOCOL_SECTIONS):
-        logger.info("Protocol section %s/%s: %s", i + 1, len(PROTOCOL_SECTIONS), section.heading)
-        text = generate_section(
-            "protocol",
-            section,
+    return asyncio.run(
+        _abuild_document(
+            doc_type,
+            output_path,
             trial_context,
-            config=config,
-            client=client,
-            reasoning_effort=reasoning_effort,
+            config,
+            reasoning_effort,
+            limiter,
+            sections=sections,
+            checkpoint_dir=checkpoint_dir,
+            trial_id=trial_id,
         )
-        parts.append(text)
-    full = "\n\n".join(parts)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(full, encoding="utf-8")
-    return len(full.split())
+    )
 
 
-def build_sap(
+def build_protocol(
     output_path: Path,
     trial_context: Optional[Dict[str, Any]] = None,
     trial_id: str = "trial_001",
     config: Optional[Config] = None,
     client: Optional[OpenAI] = None,
     reasoning_effort: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+    checkpoint_dir: Optional[Path] = None,
 ) -> int:
+    """Generate Protocol (60-80 pp); see build_document.
+
+    ``client`` is deprecated and ignored (kept so positional calls still line up).
     """
-    Generate SAP (20-30 pp) and write to output_path.
+    _warn_client_ignored(client)
+    return build_document(
+        "protocol",
+        output_path,
+        trial_context,
+        config,
+        reasoning_effort=reasoning_effort,
+        limiter=limiter,
+        trial_id=trial_id,
+        checkpoint_dir=checkpoint_dir,
+    )
 
-    Args:
-        reasoning_effort: Optional GPT-5.2 reasoning effort level.
 
-    Returns total word count.
+def build_sap(
+    output_path: Path,
+    trial_context: Optional[Dict[str, Any]] = None,
+    trial_id: str = "trial_001",
+    config: Optional[Config] = None,
+    client: Optional[OpenAI] = None,
+    reasoning_effort: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+    checkpoint_dir: Optional[Path] = None,
+) -> int:
+    """Generate SAP (20-30 pp); see build_document.
+
+    ``client`` is deprecated and ignored (kept so positional calls still line up).
     """
-    config = config or Config()
-    client = client or OpenAI(api_key=config.api_key)
-    parts = []
-    for i, section in enumerate(SAP_SECTIONS):
-        logger.info("SAP section %s/%s: %s", i + 1, len(SAP_SECTIONS), section.heading)
-        text = generate_section(
-            "sap",
-            section,
-            trial_context,
-            config=config,
-            client=client,
-            reasoning_effort=reasoning_effort,
-        )
-        parts.append(text)
-    full = "\n\n".join(parts)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(full, encoding="utf-8")
-    return len(full.split())
+    _warn_client_ignored(client)
+    return build_document(
+        "sap",
+        output_path,
+        trial_context,
+        config,
+        reasoning_effort=reasoning_effort,
+        limiter=limiter,
+        trial_id=trial_id,
+        checkpoint_dir=checkpoint_dir,
+    )
 
 
 def build_summary_tables(
@@ -100,35 +385,21 @@ def build_summary_tables(
     config: Optional[Config] = None,
     client: Optional[OpenAI] = None,
     reasoning_effort: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+    checkpoint_dir: Optional[Path] = None,
 ) -> int:
-    """
-    Generate Summary Tables/Listings (30-40 pp) and write to output_path.
+    """Generate Summary Tables/Listings (30-40 pp); see build_document.
 
-    Args:
-        reasoning_effort: Optional GPT-5.2 reasoning effort level.
-
-    Returns total word count.
+    ``client`` is deprecated and ignored (kept so positional calls still line up).
     """
-    config = config or Config()
-    client = client or OpenAI(api_key=config.api_key)
-    parts = []
-    for i, section in enumerate(SUMMARY_TABLE_SECTIONS):
-        logger.info(
-            "Summary Tables section %s/%s: %s",
-            i + 1,
-            len(SUMMARY_TABLE_SECTIONS),
-            section.heading,
-        )
-        text = generate_section(
-            "summary_tables",
-            section,
-            trial_context,
-            config=config,
-            client=client,
-            reasoning_effort=reasoning_effort,
-        )
-        parts.append(text)
-    full = "\n\n".join(parts)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(full, encoding="utf-8")
-    return len(full.split())
+    _warn_client_ignored(client)
+    return build_document(
+        "summary_tables",
+        output_path,
+        trial_context,
+        config,
+        reasoning_effort=reasoning_effort,
+        limiter=limiter,
+        trial_id=trial_id,
+        checkpoint_dir=checkpoint_dir,
+    )
@@ -0,0 +1,101 @@
+"""Run checkpoint: finished trials plus per-section progress of unfinished ones.
+
+``<output_dir>/checkpoint.json`` holds::
+
+    {"trials_done": [...], "total_words": N, "last_trial_id": "trial_007",
+     "trials": {"trial_008": {"protocol": {"completed_sections": [...]},
+                              "sap": {"completed_sections": [...], "words": N}}}}
+
+The builders add each section's index (its ``NN.txt`` part file) to
+``trials`` as soon as the part file is written, so a crash loses at most
+the sections in flight; a document with ``words`` set is already
+assembled.  A trial's entry is dropped once the trial is in
+``trials_done``.  Every write goes through an
+fsync'd temp file and a rename.  Concurrent trials share the file safely
+because each update is a synchronous load-modify-save on one event loop.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILENAME = "checkpoint.json"
+
+
+def _read(output_dir: Path) -> Dict[str, Any]:
+    path = output_dir / CHECKPOINT_FILENAME
+    if not path.exists():
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning("Could not load checkpoint: %s", e)
+        return {}
+
+
+def _write(output_dir: Path, checkpoint: Dict[str, Any]) -> None:
+    """Atomically replace the checkpoint (fsync'd before the rename)."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / CHECKPOINT_FILENAME
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp_path.replace(path)
+
+
+def load_checkpoint(output_dir: Path) -> Dict[str, Any]:
+    """Load checkpoint if it exists."""
+    checkpoint = _read(output_dir)
+    checkpoint.setdefault("trials_done", [])
+    checkpoint.setdefault("total_words", 0)
+    checkpoint.setdefault("last_trial_id", None)
+    return checkpoint
+
+
+def save_checkpoint(
+    output_dir: Path,
+    trials_done: List[str],
+    total_words: int,
+    last_trial_id: Optional[str] = None,
+) -> None:
+    """Save checkpoint, keeping section progress of trials not yet done."""
+    trials = {
+        trial_id: progress
+        for trial_id, progress in _read(output_dir).get("trials", {}).items()
+        if trial_id not in trials_done
+    }
+    _write(
+        output_dir,
+        {
+            "trials_done": trials_done,
+            "total_words": total_words,
+            "last_trial_id": last_trial_id,
+            "trials": trials,
+        },
+    )
+
+
+def load_section_progress(output_dir: Path, trial_id: str) -> Dict[str, Any]:
+    """Load {doc_type: {"completed_sections": [...], "words": N}} for a trial."""
+    return _read(output_dir).get("trials", {}).get(trial_id, {})
+
+
+def save_section_progress(output_dir: Path, trial_id: str, progress: Dict[str, Any]) -> None:
+    """Record *progress* (as from load_section_progress) for one trial."""
+    checkpoint = _read(output_dir)
+    checkpoint.setdefault("trials", {})[trial_id] = progress
+    _write(output_dir, checkpoint)
+
+
+def clear_section_progress(output_dir: Path, trial_id: str) -> None:
+    """Forget any section progress of *trial_id* (to regenerate it from scratch)."""
+    checkpoint = _read(output_dir)
+    if checkpoint.get("trials", {}).pop(trial_id, None) is not None:
+        _write(output_dir, checkpoint)
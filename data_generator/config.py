@@ -14,15 +14,38 @@ GPT-5.2 specs:
   - Reasoning effort: none (default), low, medium, high, xhigh
 """
 
+import logging
 import os
+from functools import lru_cache
 from pathlib import Path
 from dataclasses import dataclass
+from typing import Optional
 
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    pass
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _load_dotenv_once() -> None:
+    """Load .env into the environment (at most once per process)."""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+
+def _validate_model(model: str) -> None:
+    """Warn (not error) if the model is not in the known-good list."""
+    if model not in SUPPORTED_MODELS_SET:
+        logger.warning(
+            "Model '%s' is not in the explicitly supported list %s. "
+            "Proceeding anyway — the API will reject if the model ID is invalid.",
+            model,
+            SUPPORTED_MODELS,
+        )
+
+
+_load_dotenv_once()
 
 
 # Page definition: 1 page = 300 words
@@ -37,10 +60,11 @@ SUMMARY_TABLES_PAGES_MIN = 30
 SUMMARY_TABLES_PAGES_MAX = 40
 
 # Supported models (GPT-5.2 series)
-SUPPORTED_MODELS = [
+SUPPORTED_MODELS = (
     "gpt-5.2",                # Latest alias (recommended)
     "gpt-5.2-2025-12-11",     # Pinned snapshot
-]
+)
+SUPPORTED_MODELS_SET = frozenset(SUPPORTED_MODELS)  # For membership checks
 
 # GPT-5.2 limits
 GPT_5_2_CONTEXT_WINDOW = 400_000     # tokens
@@ -58,9 +82,16 @@ class Config:
     output_dir: str = "synthetic_output"
     model: str = "gpt-5.2"
     max_completion_tokens: int = 16_384  # Per-call output limit (well within 128k max)
-    delay_between_calls_sec: float = 1.0
+    delay_between_calls_sec: float = 0.0  # Min wait after a 429 without Retry-After
     checkpoint_path: str = "synthetic_output/checkpoint.json"
     max_retries: int = 3
+    max_concurrency: int = 6  # In-flight section requests per document
+    trial_concurrency: int = 2  # Trials generated at once
+    requests_per_minute: Optional[int] = None  # Client-side RPM budget (None = unlimited)
+    tokens_per_minute: Optional[int] = None    # Client-side TPM budget (None = unlimited)
+    batch_poll_interval_sec: float = 60.0  # Batch API status polling (--use-batch-api)
+    cache_dir: Optional[str] = "~/.cache/clinirep_gen"  # Section response cache (None = off)
+    single_shot_per_doc: bool = False  # One structured-output call per document
     words_per_page: int = WORDS_PER_PAGE
 
     # Page targets per trial
@@ -71,6 +102,10 @@ class Config:
     summary_tables_pages_min: int = SUMMARY_TABLES_PAGES_MIN
     summary_tables_pages_max: int = SUMMARY_TABLES_PAGES_MAX
 
+    def __post_init__(self) -> None:
+        # Validated once here rather than on every API call
+        _validate_model(self.model)
+
     @property
     def api_key(self) -> str:
         """OpenAI API key from environment."""
@@ -1,6 +1,6 @@
 """CONSORT 2025 section list and item descriptions for prompts."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List
 
 
@@ -13,10 +13,28 @@ class SectionSpec:
     short_description: str
     target_words: int = 800
     consort_item_ids: List[str] = None
+    # Prompt text that depends only on the section, formatted once here
+    # rather than on every request (see prompts/templates.py)
+    consort_items: str = field(init=False, repr=False, compare=False)
+    prompt_fragment: str = field(init=False, repr=False, compare=False)
+    listing_fragment: str = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if self.consort_item_ids is None:
             self.consort_item_ids = []
+        self.consort_items = ", ".join(self.consort_item_ids) or "general"
+        self.prompt_fragment = (
+            "Section heading (use exactly this at the start of your response):\n"
+            f"{self.heading}\n\n"
+            f"Section purpose: {self.short_description}\n\n"
+            f"Target length: approximately {self.target_words} words."
+        )
+        self.listing_fragment = (
+            f"Heading: {self.heading}\n"
+            f"Purpose: {self.short_description}\n"
+            f"CONSORT 2025 items: {self.consort_items}\n"
+            f"Target length: approximately {self.target_words} words"
+        )
 
 
 # Protocol sections (60-80 pp total; ~18-24k words)
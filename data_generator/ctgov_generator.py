@@ -1,9 +1,10 @@
 """Optional: generate CT.gov-shaped JSON from trial context for CliniRepGen ingest."""
 
-import json
 from pathlib import Path
 from typing import Any, Dict
 
+import msgspec
+
 from data_generator.trial_context import get_trial_context
 
 
@@ -52,4 +53,5 @@ def write_ctgov(
     """Write ctgov.json to output_path (e.g. trial_dir/ctgov.json)."""
     data = build_ctgov_from_context(trial_context, trial_id=trial_id, nct_id=nct_id)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    # msgspec encodes in C; format() re-indents the compact bytes for readability
+    output_path.write_bytes(msgspec.json.format(msgspec.json.encode(data), indent=2))
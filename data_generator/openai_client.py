@@ -12,36 +12,90 @@ GPT-5.2 API notes:
   - Temperature is supported and useful for controlling creativity
 """
 
+import asyncio
 import logging
+import shutil
 import time
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
 
-from openai import OpenAI
+import httpx
+import msgspec
+from openai import APIError, AsyncOpenAI, OpenAI, RateLimitError
 
-from data_generator.config import Config, SUPPORTED_MODELS
+from data_generator.config import GPT_5_2_MAX_OUTPUT_TOKENS, Config
 from data_generator.prompts.templates import (
     SYSTEM_PROMPT,
+    build_document_prompt,
     build_protocol_section_prompt,
     build_sap_section_prompt,
     build_summary_tables_section_prompt,
 )
 from data_generator.consort_sections import SectionSpec
+from data_generator.rate_limiter import RateLimiter
+from data_generator.response_cache import cache_key, open_response_cache
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Upper bound on a server-requested Retry-After wait
+_MAX_RETRY_AFTER_SEC = 60.0
+
+# Chat-format framing tokens per message (role markers, separators)
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+# Connection pool for the shared async client: one pool serves every trial
+# and section in a run, and HTTP/2 multiplexes concurrent requests as
+# streams on a few connections, so a handful of TLS handshakes cover a run
+_POOL_LIMITS = httpx.Limits(max_connections=8, max_keepalive_connections=8)
+_HTTP_TIMEOUT = httpx.Timeout(600.0, connect=5.0)  # long streamed completions
+
 # Valid reasoning_effort values for GPT-5.2
-VALID_REASONING_EFFORTS = {"none", "low", "medium", "high", "xhigh"}
+VALID_REASONING_EFFORTS = frozenset({"none", "low", "medium", "high", "xhigh"})
 
 
-def _validate_model(model: str) -> None:
-    """Warn (not error) if the model is not in the known-good list."""
-    if model not in SUPPORTED_MODELS:
-        logger.warning(
-            "Model '%s' is not in the explicitly supported list %s. "
-            "Proceeding anyway — the API will reject if the model ID is invalid.",
-            model,
-            SUPPORTED_MODELS,
-        )
+# The few fields of a streamed chat.completion.chunk that are read.  The
+# stream's server-sent events are decoded straight into these with msgspec
+# (unknown fields skipped) instead of stdlib json plus the SDK's pydantic
+# models, which for a long section is thousands of envelopes per call.
+class _PromptTokensDetails(msgspec.Struct):
+    cached_tokens: int = 0
+
+
+class _Usage(msgspec.Struct):
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    prompt_tokens_details: Optional[_PromptTokensDetails] = None
+
+
+class _Delta(msgspec.Struct):
+    content: Optional[str] = None
+
+
+class _StreamChoice(msgspec.Struct):
+    delta: _Delta = msgspec.field(default_factory=_Delta)
+
+
+class _StreamChunk(msgspec.Struct):
+    choices: List[_StreamChoice] = []
+    usage: Optional[_Usage] = None
+    error: Optional[Dict[str, Any]] = None
+
+
+_CHUNK_DECODER = msgspec.json.Decoder(_StreamChunk)
+
+
+def _make_async_client(config: Config) -> AsyncOpenAI:
+    """AsyncOpenAI on one pooled HTTP/2 httpx.AsyncClient, to share for a whole run."""
+    return AsyncOpenAI(
+        api_key=config.api_key,
+        http_client=httpx.AsyncClient(
+            http2=True, limits=_POOL_LIMITS, timeout=_HTTP_TIMEOUT
+        ),
+    )
 
 
 def _build_api_kwargs(
@@ -77,6 +131,140 @@ def _build_api_kwargs(
     return kwargs
 
 
+@lru_cache(maxsize=None)
+def _encoder(model: str) -> Any:
+    """tiktoken encoding for *model*, or None if tiktoken can't provide one.
+
+    tiktoken downloads its BPE tables on first use, so a missing package or
+    an offline host falls back to a character-based estimate.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("tiktoken unavailable (%s); estimating tokens as chars/4", e)
+        return None
+
+
+def _count_tokens(model: str, text: str) -> int:
+    enc = _encoder(model)
+    return len(enc.encode(text)) if enc else len(text) // 4 + 1
+
+
+@lru_cache(maxsize=None)
+def _system_prompt_tokens(model: str) -> int:
+    """Token count of the constant system message, tokenized once per model."""
+    return _count_tokens(model, SYSTEM_PROMPT) + _MESSAGE_OVERHEAD_TOKENS
+
+
+def _estimate_tokens(config: Config, messages: list) -> int:
+    """Upper-bound tokens for one call: prompt tokens + max_completion_tokens.
+
+    The system message (the bulk of the prompt) is counted once per model;
+    only the short, trial-specific user message is tokenized per call.
+    """
+    prompt_tokens = 0
+    for message in messages:
+        if message["role"] == "system" and message["content"] == SYSTEM_PROMPT:
+            prompt_tokens += _system_prompt_tokens(config.model)
+        else:
+            prompt_tokens += (
+                _count_tokens(config.model, message["content"]) + _MESSAGE_OVERHEAD_TOKENS
+            )
+    return prompt_tokens + config.max_completion_tokens
+
+
+def _build_messages(
+    doc_type: str,
+    section: SectionSpec,
+    trial_context: Optional[Dict[str, Any]] = None,
+) -> list:
+    """Build the system + user messages for one section of *doc_type*.
+
+    The system message is always the constant SYSTEM_PROMPT, so every call
+    starts with the same prefix for OpenAI prompt caching (see templates).
+    """
+    if doc_type == "protocol":
+        user_prompt = build_protocol_section_prompt(section, trial_context)
+    elif doc_type == "sap":
+        user_prompt = build_sap_section_prompt(section, trial_context)
+    elif doc_type == "summary_tables":
+        user_prompt = build_summary_tables_section_prompt(
+            section, trial_context
+        )
+    else:
+        raise ValueError(f"Unknown doc_type: {doc_type}")
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Server-requested delay from a rate-limit response's headers, if any."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if (ms := headers.get("retry-after-ms")) is not None:
+            return float(ms) / 1000
+        if (sec := headers.get("retry-after")) is not None:
+            return float(sec)
+    except ValueError:  # HTTP-date form; fall back to backoff
+        return None
+    return None
+
+
+def _retry_delay(exc: BaseException, attempt: int, config: Config) -> float:
+    """Seconds to wait before retrying after *exc*.
+
+    A 429 waits exactly as long as its Retry-After header asks (capped at
+    _MAX_RETRY_AFTER_SEC).  Without the header it waits at least
+    config.delay_between_calls_sec.  Any other failure gets plain
+    exponential backoff.
+    """
+    backoff = float(2 ** attempt)
+    if isinstance(exc, RateLimitError):
+        retry_after = _retry_after_seconds(exc)
+        if retry_after is not None:
+            return min(retry_after, _MAX_RETRY_AFTER_SEC)
+        return max(backoff, config.delay_between_calls_sec)
+    return backoff
+
+
+def _log_usage(usage: Any) -> None:
+    """Log token usage for cost tracking (cached = prompt-cache hits)."""
+    if not usage:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    logger.debug(
+        "Tokens — prompt: %s (cached: %s), completion: %s, total: %s",
+        usage.prompt_tokens,
+        getattr(details, "cached_tokens", 0) if details else 0,
+        usage.completion_tokens,
+        usage.total_tokens,
+    )
+
+
+def _response_text(response: Any) -> str:
+    """Extract the stripped completion text, logging token usage."""
+    choice = response.choices[0]
+    text = (choice.message.content or "").strip()
+    if not text:
+        raise ValueError("Empty response from API")
+
+    _log_usage(response.usage)
+    return text
+
+
 def generate_section(
     doc_type: str,
     section: SectionSpec,
@@ -105,60 +293,233 @@ def generate_section(
         Generated text (should start with the section heading).
     """
     config = config or Config()
-    _validate_model(config.model)
     if client is None:
         client = OpenAI(api_key=config.api_key)
 
-    if doc_type == "protocol":
-        user_prompt = build_protocol_section_prompt(section, trial_context)
-    elif doc_type == "sap":
-        user_prompt = build_sap_section_prompt(section, trial_context)
-    elif doc_type == "summary_tables":
-        user_prompt = build_summary_tables_section_prompt(
-            section, trial_context
-        )
-    else:
-        raise ValueError(f"Unknown doc_type: {doc_type}")
-
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": user_prompt},
-    ]
+    messages = _build_messages(doc_type, section, trial_context)
     api_kwargs = _build_api_kwargs(config, messages, reasoning_effort)
+    cache = open_response_cache(config)
+    key = cache_key(api_kwargs)
+    if cache is not None and (hit := cache.lookup(key)) is not None:
+        logger.debug("Response cache hit for '%s'", section.heading)
+        return hit.read_text(encoding="utf-8")
 
     last_error = None
     for attempt in range(config.max_retries):
         try:
-            if config.delay_between_calls_sec and attempt > 0:
-                time.sleep(config.delay_between_calls_sec)
-
             response = client.chat.completions.create(**api_kwargs)
+            text = _response_text(response)
+            if cache is not None:
+                cache.store_text(key, text)
+            return text
+        except Exception as e:
+            last_error = e
+            logger.warning(
+                "OpenAI call attempt %s/%s failed: %s",
+                attempt + 1,
+                config.max_retries,
+                e,
+            )
+            if attempt < config.max_retries - 1:
+                time.sleep(_retry_delay(e, attempt, config))
+    raise RuntimeError(
+        f"Failed after {config.max_retries} attempts: {last_error}"
+    ) from last_error
 
-            choice = response.choices[0]
-            text = (choice.message.content or "").strip()
-            if not text:
-                raise ValueError("Empty response from API")
 
-            # Log token usage for cost tracking
-            if response.usage:
-                logger.debug(
-                    "Tokens — prompt: %s, completion: %s, total: %s",
-                    response.usage.prompt_tokens,
-                    response.usage.completion_tokens,
-                    response.usage.total_tokens,
-                )
+async def _astream_to_file(client: AsyncOpenAI, api_kwargs: Dict[str, Any], path: Path) -> None:
+    """Stream one completion into *path*, stripped exactly like ``str.strip()``.
 
-            return text
+    Leading whitespace is dropped and trailing whitespace is held back until
+    more text follows it, so the file never needs the whole response in memory.
+    """
+    started = False
+    pending_ws = ""
+    async with client.chat.completions.with_streaming_response.create(
+        **api_kwargs, stream=True, stream_options={"include_usage": True}
+    ) as response:
+        with open(path, "w", encoding="utf-8") as f:
+            async for line in response.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                chunk = _CHUNK_DECODER.decode(data)
+                if chunk.error:
+                    raise APIError(
+                        chunk.error.get("message") or "An error occurred during streaming",
+                        request=response.http_request,
+                        body=chunk.error,
+                    )
+                if chunk.usage:
+                    _log_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content or ""
+                if not started:
+                    piece = piece.lstrip()
+                body = piece.rstrip()
+                if body:
+                    f.write(pending_ws + body)
+                    pending_ws = piece[len(body):]
+                    started = True
+                else:
+                    pending_ws += piece
+    if not started:
+        raise ValueError("Empty response from API")
+
+
+async def _aretry(config: Config, label: str, attempt_fn: Callable[[], Awaitable[T]]) -> T:
+    """Run *attempt_fn* with the same retry/backoff policy as generate_section."""
+    last_error = None
+    for attempt in range(config.max_retries):
+        try:
+            return await attempt_fn()
         except Exception as e:
             last_error = e
             logger.warning(
-                "OpenAI call attempt %s/%s failed: %s",
+                "OpenAI call attempt %s/%s failed for '%s': %s",
                 attempt + 1,
                 config.max_retries,
+                label,
                 e,
             )
             if attempt < config.max_retries - 1:
-                time.sleep(2 ** attempt)  # exponential backoff
+                await asyncio.sleep(_retry_delay(e, attempt, config))
     raise RuntimeError(
         f"Failed after {config.max_retries} attempts: {last_error}"
     ) from last_error
+
+
+async def _astream_section(
+    doc_type: str,
+    section: SectionSpec,
+    trial_context: Optional[Dict[str, Any]],
+    config: Config,
+    client: AsyncOpenAI,
+    path: Path,
+    reasoning_effort: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> None:
+    """
+    Async counterpart of :func:`generate_section` that streams into *path*.
+
+    Same prompts, retries and backoff, but waiting with ``asyncio.sleep`` so
+    the builders can keep every section of a document in flight at once.
+    A response-cache hit is copied to *path* without calling the API.
+    Tokens are written to ``path.tmp`` as they arrive, and the file is
+    renamed to *path* only once the section is complete.  A failed attempt
+    therefore never leaves a truncated section behind.
+    With a *limiter*, every attempt first waits for its estimated request
+    and token cost to fit the RPM/TPM budget.
+    """
+    messages = _build_messages(doc_type, section, trial_context)
+    api_kwargs = _build_api_kwargs(config, messages, reasoning_effort)
+    cache = open_response_cache(config)
+    key = cache_key(api_kwargs)
+    if cache is not None and (hit := cache.lookup(key)) is not None:
+        logger.debug("Response cache hit for '%s'", section.heading)
+        shutil.copyfile(hit, path)
+        return
+    estimated_tokens = _estimate_tokens(config, messages) if limiter else 0
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    async def _attempt() -> None:
+        if limiter is not None:
+            await limiter.acquire(estimated_tokens)
+        await _astream_to_file(client, api_kwargs, tmp_path)
+        tmp_path.replace(path)
+
+    try:
+        await _aretry(config, section.heading, _attempt)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    if cache is not None:
+        cache.store_file(key, path)
+
+
+def _document_output_tokens(sections: Sequence[SectionSpec]) -> int:
+    """Rough output-token estimate for a whole document (~4/3 tokens per word)."""
+    return sum(section.target_words for section in sections) * 4 // 3
+
+
+def _document_schema(sections: Sequence[SectionSpec]) -> Dict[str, Any]:
+    """Strict JSON schema: one required string property per section heading."""
+    headings = [section.heading for section in sections]
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "document_sections",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {heading: {"type": "string"} for heading in headings},
+                "required": headings,
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+async def _agenerate_document(
+    doc_type: str,
+    sections: Sequence[SectionSpec],
+    trial_context: Optional[Dict[str, Any]],
+    config: Config,
+    client: AsyncOpenAI,
+    reasoning_effort: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> List[str]:
+    """
+    Generate every section of a document in one structured-output call.
+
+    Returns the section texts in section order.  The completion budget is
+    raised to fit the whole document, up to GPT-5.2's 128k output limit.
+    Check :func:`_document_output_tokens` before calling.
+    """
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_document_prompt(doc_type, sections, trial_context)},
+    ]
+    api_kwargs = _build_api_kwargs(config, messages, reasoning_effort)
+    api_kwargs["max_completion_tokens"] = min(
+        GPT_5_2_MAX_OUTPUT_TOKENS,
+        max(config.max_completion_tokens, 2 * _document_output_tokens(sections)),
+    )
+    api_kwargs["response_format"] = _document_schema(sections)
+    cache = open_response_cache(config)
+    key = cache_key(api_kwargs)
+    estimated_tokens = (
+        _estimate_tokens(config, messages)
+        - config.max_completion_tokens
+        + api_kwargs["max_completion_tokens"]
+        if limiter
+        else 0
+    )
+
+    def _parse(content: str) -> List[str]:
+        data = msgspec.json.decode(content)
+        texts = [(data.get(section.heading) or "").strip() for section in sections]
+        missing = [s.heading for s, text in zip(sections, texts) if not text]
+        if missing:
+            raise ValueError(f"Empty sections in response: {missing}")
+        return texts
+
+    if cache is not None and (hit := cache.lookup(key)) is not None:
+        logger.debug("Response cache hit for %s document", doc_type)
+        return _parse(hit.read_text(encoding="utf-8"))
+
+    async def _attempt() -> List[str]:
+        if limiter is not None:
+            await limiter.acquire(estimated_tokens)
+        response = await client.chat.completions.create(**api_kwargs)
+        if response.choices[0].finish_reason == "length":
+            raise ValueError("Response truncated at max_completion_tokens")
+        content = _response_text(response)
+        texts = _parse(content)
+        if cache is not None:
+            cache.store_text(key, content)
+        return texts
+
+    return await _aretry(config, f"{doc_type} (single shot)", _attempt)
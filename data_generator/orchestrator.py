@@ -1,54 +1,72 @@
-"""Orchestrator: generate Protocol, SAP, Summary Tables per trial with checkpointing."""
+"""Orchestrator: generate Protocol, SAP, Summary Tables per trial with checkpointing.
 
-import json
+Trials are independent, so several run concurrently on one event loop
+(bounded by Config.trial_concurrency).
+"""
+
+import asyncio
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from data_generator.config import Config
-from data_generator.builders import build_protocol, build_sap, build_summary_tables
+from data_generator.builders import DOC_SPECS, _abuild_document, _warn_client_ignored
+from data_generator.checkpoint import (
+    clear_section_progress,
+    load_checkpoint,
+    save_checkpoint,
+)
 from data_generator.ctgov_generator import write_ctgov
+from data_generator.openai_client import _make_async_client
+from data_generator.rate_limiter import RateLimiter, make_rate_limiter
 from data_generator.trial_context import get_trial_context
 
 logger = logging.getLogger(__name__)
 
-CHECKPOINT_FILENAME = "checkpoint.json"
-
+def _prepare_trial_dir(
+    output_dir: Path,
+    trial_id: str,
+    trial_context: Optional[Dict[str, Any]],
+) -> Path:
+    """Create output_dir/trial_id (with ctgov.json when there is context)."""
+    trial_dir = output_dir / trial_id
+    trial_dir.mkdir(parents=True, exist_ok=True)
 
-def load_checkpoint(output_dir: Path) -> Dict[str, Any]:
-    """Load checkpoint if it exists."""
-    path = output_dir / CHECKPOINT_FILENAME
-    if not path.exists():
-        return {"trials_done": [], "total_words": 0, "last_trial_id": None}
-    try:
-        with open(path) as f:
-            return json.load(f)
-    except Exception as e:
-        logger.warning("Could not load checkpoint: %s", e)
-        return {"trials_done": [], "total_words": 0, "last_trial_id": None}
+    # Optional: write ctgov.json for CliniRepGen ingest
+    if trial_context:
+        nct_num = abs(hash(trial_id)) % 10**8
+        nct_id = f"NCT{nct_num:08d}"
+        write_ctgov(trial_dir / "ctgov.json", trial_context, trial_id=trial_id, nct_id=nct_id)
+    return trial_dir
 
 
-def save_checkpoint(
+async def _arun_trial(
+    trial_id: str,
     output_dir: Path,
-    trials_done: List[str],
-    total_words: int,
-    last_trial_id: Optional[str] = None,
-) -> None:
-    """Save checkpoint."""
-    output_dir.mkdir(parents=True, exist_ok=True)
-    path = output_dir / CHECKPOINT_FILENAME
-    with open(path, "w") as f:
-        json.dump(
-            {
-                "trials_done": trials_done,
-                "total_words": total_words,
-                "last_trial_id": last_trial_id,
-            },
-            f,
-            indent=2,
+    trial_context: Optional[Dict[str, Any]],
+    config: Config,
+    reasoning_effort: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+    aclient: Optional[AsyncOpenAI] = None,
+) -> int:
+    trial_dir = _prepare_trial_dir(output_dir, trial_id, trial_context)
+
+    total = 0
+    for doc_type in DOC_SPECS:
+        total += await _abuild_document(
+            doc_type,
+            trial_dir / f"{doc_type}.txt",
+            trial_context,
+            config,
+            reasoning_effort,
+            limiter,
+            aclient,
+            checkpoint_dir=output_dir,
+            trial_id=trial_id,
         )
+    return total
 
 
 def run_trial(
@@ -58,54 +76,103 @@ def run_trial(
     config: Optional[Config] = None,
     client: Optional[OpenAI] = None,
     reasoning_effort: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
 ) -> int:
     """
     Generate Protocol, SAP, and Summary Tables for one trial.
     Writes protocol.txt, sap.txt, summary_tables.txt under output_dir/trial_id/.
 
     Args:
+        client: Deprecated and ignored (kept so positional calls still line up).
         reasoning_effort: Optional GPT-5.2 reasoning effort
                           ("none", "low", "medium", "high", "xhigh").
+        limiter: Optional RateLimiter shared by all three documents.
 
     Returns total word count for this trial.
     """
+    _warn_client_ignored(client)
     config = config or Config()
-    client = client or OpenAI(api_key=config.api_key)
-    trial_dir = output_dir / trial_id
-    trial_dir.mkdir(parents=True, exist_ok=True)
+    return asyncio.run(
+        _arun_trial(trial_id, output_dir, trial_context, config, reasoning_effort, limiter)
+    )
 
-    # Optional: write ctgov.json for CliniRepGen ingest
-    if trial_context:
-        nct_num = abs(hash(trial_id)) % 10**8
-        nct_id = f"NCT{nct_num:08d}"
-        write_ctgov(trial_dir / "ctgov.json", trial_context, trial_id=trial_id, nct_id=nct_id)
 
-    total = 0
-    total += build_protocol(
-        trial_dir / "protocol.txt",
-        trial_context=trial_context,
-        trial_id=trial_id,
-        config=config,
-        client=client,
-        reasoning_effort=reasoning_effort,
-    )
-    total += build_sap(
-        trial_dir / "sap.txt",
-        trial_context=trial_context,
-        trial_id=trial_id,
-        config=config,
-        client=client,
-        reasoning_effort=reasoning_effort,
-    )
-    total += build_summary_tables(
-        trial_dir / "summary_tables.txt",
-        trial_context=trial_context,
-        trial_id=trial_id,
-        config=config,
-        client=client,
-        reasoning_effort=reasoning_effort,
-    )
-    return total
+async def _arun(
+    output_path: Path,
+    num_trials: int,
+    resume: bool,
+    start_index: int,
+    seed: Optional[int],
+    config: Config,
+    reasoning_effort: Optional[str],
+) -> Dict[str, Any]:
+    checkpoint = load_checkpoint(output_path) if resume else {}
+    trials_done = checkpoint.get("trials_done", [])
+    total_words = checkpoint.get("total_words", 0)
+    limiter = make_rate_limiter(config.requests_per_minute, config.tokens_per_minute)
+    sem = asyncio.Semaphore(config.trial_concurrency)
+
+    async def _process_trial(i: int, aclient: AsyncOpenAI) -> None:
+        nonlocal total_words
+        trial_id = f"trial_{i+1:03d}"
+        trial_context = get_trial_context(i, seed=seed)
+        if not resume:
+            clear_section_progress(output_path, trial_id)
+        async with sem:
+            logger.info(
+                "Starting trial %s (%s)", trial_id, trial_context.get("brief_title", "")[:60]
+            )
+            try:
+                words = await _arun_trial(
+                    trial_id,
+                    output_path,
+                    trial_context,
+                    config,
+                    reasoning_effort,
+                    limiter,
+                    aclient,
+                )
+            except Exception as e:
+                logger.exception("Trial %s failed: %s", trial_id, e)
+                raise
+        # Trials finish in any order; each one is checkpointed as it completes
+        # (which also drops its section progress)
+        total_words += words
+        trials_done.append(trial_id)
+        save_checkpoint(output_path, trials_done, total_words, trial_id)
+        pages = total_words // config.words_per_page
+        logger.info(
+            "Trial %s done: %s words (%s pages total so far)",
+            trial_id,
+            words,
+            pages,
+        )
+
+    pending = []
+    for i in range(start_index, start_index + num_trials):
+        trial_id = f"trial_{i+1:03d}"
+        if trial_id in trials_done:
+            logger.info("Skipping already done trial: %s", trial_id)
+            continue
+        pending.append(i)
+    # One client (and connection pool) for every trial in the run.  Every
+    # trial settles (and is checkpointed) before the client is closed, even
+    # if another one fails.
+    async with _make_async_client(config) as aclient:
+        results = await asyncio.gather(
+            *[_process_trial(i, aclient) for i in pending],
+            return_exceptions=True,
+        )
+    failures = [r for r in results if isinstance(r, BaseException)]
+    if failures:
+        logger.error("%s of %s trials failed", len(failures), len(pending))
+        raise failures[0]
+
+    return {
+        "trials_done": trials_done,
+        "total_words": total_words,
+        "total_pages": total_words // config.words_per_page,
+    }
 
 
 def run(
@@ -121,51 +188,23 @@ def run(
     Main entry: generate Minimal Viable Dataset for num_trials (trial_001, trial_002, ...).
 
     Uses GPT-5.2 by default (configurable via config.model).
-    If resume=True, skip trials already in checkpoint.
+    If resume=True, skip trials already in checkpoint.  Up to
+    config.trial_concurrency trials are generated at once, each with its
+    sections in flight concurrently.
 
     Args:
         reasoning_effort: Optional GPT-5.2 reasoning effort
                           ("none", "low", "medium", "high", "xhigh").
     """
     config = config or Config()
-    output_path = Path(output_dir)
-    checkpoint = load_checkpoint(output_path) if resume else {}
-    trials_done = checkpoint.get("trials_done", [])
-    total_words = checkpoint.get("total_words", 0)
-    client = OpenAI(api_key=config.api_key)
-
-    for i in range(start_index, start_index + num_trials):
-        trial_id = f"trial_{i+1:03d}"
-        if trial_id in trials_done:
-            logger.info("Skipping already done trial: %s", trial_id)
-            continue
-        trial_context = get_trial_context(i, seed=seed)
-        logger.info("Starting trial %s (%s)", trial_id, trial_context.get("brief_title", "")[:60])
-        try:
-            words = run_trial(
-                trial_id,
-                output_path,
-                trial_context=trial_context,
-                config=config,
-                client=client,
-                reasoning_effort=reasoning_effort,
-            )
-            total_words += words
-            trials_done.append(trial_id)
-            save_checkpoint(output_path, trials_done, total_words, trial_id)
-            pages = total_words // config.words_per_page
-            logger.info(
-                "Trial %s done: %s words (%s pages total so far)",
-                trial_id,
-                words,
-                pages,
-            )
-        except Exception as e:
-            logger.exception("Trial %s failed: %s", trial_id, e)
-            raise
-
-    return {
-        "trials_done": trials_done,
-        "total_words": total_words,
-        "total_pages": total_words // config.words_per_page,
-    }
+    return asyncio.run(
+        _arun(
+            Path(output_dir),
+            num_trials,
+            resume,
+            start_index,
+            seed,
+            config,
+            reasoning_effort,
+        )
+    )
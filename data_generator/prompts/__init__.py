@@ -1,6 +1,7 @@
 """Prompt templates for Protocol, SAP, and Summary Tables."""
 
 from data_generator.prompts.templates import (
+    build_document_prompt,
     build_protocol_section_prompt,
     build_sap_section_prompt,
     build_summary_tables_section_prompt,
@@ -9,6 +10,7 @@ from data_generator.prompts.templates import (
 
 __all__ = [
     "SYSTEM_PROMPT",
+    "build_document_prompt",
     "build_protocol_section_prompt",
     "build_sap_section_prompt",
     "build_summary_tables_section_prompt",
@@ -1,10 +1,82 @@
-"""Prompt templates for generating CONSORT-aligned trial documents."""
+"""Prompt templates for generating CONSORT-aligned trial documents.
 
-from typing import Any, Dict, Optional
+Prompts are laid out for OpenAI prompt caching, which reuses the longest
+identical prefix (of at least 1024 tokens) across requests to the same
+model.  The system message is a fixed constant, and each user prompt puts
+its fixed instructions first and the trial context next, with the
+section-specific fields last.  All sections of a trial therefore share
+one cached prefix.  Keep ``--model`` the same for a whole run, because
+the cache is per model.
+"""
+
+from typing import Any, Dict, Optional, Sequence
 
 from data_generator.consort_sections import SectionSpec
 
-SYSTEM_PROMPT = """You are an expert medical writer generating realistic clinical trial documentation for a Phase 3 randomized controlled trial. Your output will be used by CliniRepGen to test automated CONSORT 2025-aligned report generation. Write in clear, formal scientific English. Use numbered or uppercase section headings exactly as specified so that document parsers can split sections. Do not invent trial identifiers or patient data that could be confused with real trials; keep everything clearly synthetic. Be consistent with the trial context provided."""
+_SYSTEM_INTRO = """You are an expert medical writer generating realistic clinical trial documentation for a Phase 3 randomized controlled trial. Your output will be used by CliniRepGen to test automated CONSORT 2025-aligned report generation. Write in clear, formal scientific English. Use numbered or uppercase section headings exactly as specified so that document parsers can split sections. Do not invent trial identifiers or patient data that could be confused with real trials; keep everything clearly synthetic. Be consistent with the trial context provided."""
+
+# Static house style shared by every section of every document.  Together
+# with _SYSTEM_INTRO it forms a >1024-token prefix that is byte-identical
+# across calls, which is what OpenAI prompt caching matches on.  It covers
+# content and style only: the output format (one section as plain text, or
+# a JSON object for a whole document) is set by each user prompt.
+WRITING_RUBRIC = """Writing rubric (applies to all content you write; follow the user message for the output format):
+
+1. Structure
+- Use numbered subheadings that extend the parent number (e.g. 3.2.1, 3.2.2) when a section needs internal structure; do not skip levels.
+- Keep paragraphs focused on one topic; prefer 80-200 words per paragraph.
+- Use bulleted or numbered lists for enumerations (eligibility criteria, visit procedures, endpoints, analysis populations); use prose for rationale and justification.
+- Do not add a summary, conclusion, or closing remarks unless the section purpose asks for one.
+
+2. Terminology and consistency
+- Refer to the investigational product by the intervention name given in the trial context, and to the comparator consistently (e.g. "placebo" or the named active control) throughout.
+- Use the same names for arms, populations (e.g. Intention-to-Treat, Per-Protocol, Safety), visits (e.g. Screening, Baseline/Day 1, Week 4, Week 12, Week 24, Follow-up) and endpoints in every section.
+- Define each abbreviation at first use in the section (e.g. "adverse event (AE)") and use the abbreviation afterwards.
+- Use ICH E3, ICH E6(R3), ICH E9 and ICH E9(R1) terminology where applicable, including estimands (population, treatment condition, variable, intercurrent events, population-level summary).
+- Use MedDRA-style terms for adverse events and system organ classes, and CTCAE-style severity grades where grading is described.
+
+3. Numbers, units and dates
+- Use SI units with a space between value and unit (e.g. 10 mg, 7.5 mmol/L); state dose, route and frequency together (e.g. 10 mg orally once daily).
+- Report percentages with one decimal place, p-values with three decimal places (or "<0.001"), and point estimates with 95% confidence intervals.
+- Keep all sample sizes, randomisation ratios, visit windows and durations consistent with the trial context and with each other.
+- Give time points relative to randomisation (e.g. "Week 12 (+/- 3 days)") rather than calendar dates.
+
+4. Statistical content
+- Name the analysis method, model terms, covariates and handling of missing data whenever an analysis is described.
+- State the type I error control strategy (e.g. fixed-sequence or Hochberg) when more than one hypothesis is tested.
+- Distinguish pre-specified from exploratory or sensitivity analyses explicitly.
+- In tables, include the analysis population and N in the title or header row, and add footnotes for abbreviations and methods.
+
+5. Tables and listings
+- Where data are tabulated, keep a consistent column order: parameter/statistic first, then one column per treatment arm, then total or difference columns where relevant.
+- Number tables and listings (e.g. Table 14.1.1, Listing 16.2.1) and give each a descriptive title.
+- Use n (%) for categorical data and n, mean (SD), median, min-max for continuous data unless the section purpose specifies otherwise.
+
+6. Synthetic-data safeguards
+- All data, names, sites, investigators and identifiers must be fictitious and clearly synthetic; never reproduce real trial results or real registry numbers.
+- Do not include personal data, real institution names or real people.
+
+7. Cross-document coherence
+- The Protocol, Statistical Analysis Plan and Summary Tables of a trial describe the same study: objectives, endpoints, estimands, sample size, randomisation, blinding and analysis populations must match across them.
+- When a section refers to material in another section or document, cite it by section or table number (e.g. "see Section 9.4" or "Table 14.2.1") rather than restating it in full.
+- Keep the primary endpoint, its time point and its analysis method identical wherever they appear.
+
+8. Register and tone
+- Write in the third person.
+- Be precise and neutral; avoid promotional language, speculation and superlatives.
+- Prefer operational detail (who does what, when, and how it is recorded) over general statements of intent.
+
+9. Trial conduct
+- State eligibility criteria as verifiable conditions (age ranges, diagnostic criteria, laboratory thresholds) rather than general descriptions.
+- Describe visit schedules with their windows and the assessments performed at each visit.
+- For safety oversight, state who reviews accumulating data (e.g. an independent Data Monitoring Committee), how often, and on what basis a stopping recommendation could be made.
+- Describe data management in operational terms: electronic case report forms, source data verification, query resolution and database lock.
+- Refer to ethics approval, informed consent and trial registration generically, without real committee names or registry numbers.
+
+10. Length
+- Stay close to the target length; if content would exceed it, prioritise the items listed in the section purpose."""
+
+SYSTEM_PROMPT = _SYSTEM_INTRO + "\n\n" + WRITING_RUBRIC
 
 
 def _trial_context_str(context: Optional[Dict[str, Any]]) -> str:
@@ -33,17 +105,14 @@ def build_protocol_section_prompt(
 ) -> str:
     """Build user prompt for one Protocol section."""
     context_str = _trial_context_str(trial_context)
-    s = f"""Generate the following section for a clinical trial protocol. Align with CONSORT 2025 where relevant (items: {', '.join(section.consort_item_ids) or 'general'}).
+    s = f"""Generate the following section for a clinical trial protocol. Align with CONSORT 2025 where relevant. Write only the section content (include the heading as the first line), no preamble or meta-commentary.
 
 Trial context:
 {context_str}
 
-Section heading (use exactly this at the start of your response):
-{section.heading}
-
-Section purpose: {section.short_description}
+CONSORT 2025 items: {section.consort_items}
 
-Target length: approximately {section.target_words} words. Write only the section content (include the heading as the first line), no preamble or meta-commentary."""
+{section.prompt_fragment}"""
     if extra_instruction:
         s += f"\n\n{extra_instruction}"
     return s
@@ -56,17 +125,12 @@ def build_sap_section_prompt(
 ) -> str:
     """Build user prompt for one SAP section."""
     context_str = _trial_context_str(trial_context)
-    s = f"""Generate the following section for a Statistical Analysis Plan (SAP) for a clinical trial.
+    s = f"""Generate the following section for a Statistical Analysis Plan (SAP) for a clinical trial. Write only the section content (include the heading as the first line), no preamble.
 
 Trial context:
 {context_str}
 
-Section heading (use exactly this at the start of your response):
-{section.heading}
-
-Section purpose: {section.short_description}
-
-Target length: approximately {section.target_words} words. Write only the section content (include the heading as the first line), no preamble."""
+{section.prompt_fragment}"""
     if extra_instruction:
         s += f"\n\n{extra_instruction}"
     return s
@@ -79,17 +143,44 @@ def build_summary_tables_section_prompt(
 ) -> str:
     """Build user prompt for one Summary Tables/Listings section."""
     context_str = _trial_context_str(trial_context)
-    s = f"""Generate the following summary table or listing section for a clinical study report. Use realistic-looking (synthetic) numbers and formatting. You may use markdown tables or structured text.
+    s = f"""Generate the following summary table or listing section for a clinical study report. Use realistic-looking (synthetic) numbers and formatting. You may use markdown tables or structured text. Write only the section content (include the heading as the first line). Use clear column headers and consistent units.
 
 Trial context:
 {context_str}
 
-Section heading (use exactly this at the start of your response):
-{section.heading}
-
-Section purpose: {section.short_description}
-
-Target length: approximately {section.target_words} words. Write only the section content (include the heading as the first line). Use clear column headers and consistent units."""
+{section.prompt_fragment}"""
     if extra_instruction:
         s += f"\n\n{extra_instruction}"
     return s
+
+
+# Opening instruction per document type for whole-document prompts
+_DOCUMENT_INTROS = {
+    "protocol": "Generate a complete clinical trial protocol. Align with CONSORT 2025 where relevant.",
+    "sap": "Generate a complete Statistical Analysis Plan (SAP) for a clinical trial.",
+    "summary_tables": (
+        "Generate the summary tables and listings of a clinical study report. Use "
+        "realistic-looking (synthetic) numbers and formatting. You may use markdown "
+        "tables or structured text. Use clear column headers and consistent units."
+    ),
+}
+
+
+def build_document_prompt(
+    doc_type: str,
+    sections: Sequence[SectionSpec],
+    trial_context: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Build one user prompt asking for every section of a document as JSON."""
+    if doc_type not in _DOCUMENT_INTROS:
+        raise ValueError(f"Unknown doc_type: {doc_type}")
+    context_str = _trial_context_str(trial_context)
+    listing = "\n\n".join(section.listing_fragment for section in sections)
+    return f"""{_DOCUMENT_INTROS[doc_type]} Return a JSON object with one key per section heading (exactly as listed); each value is that section's full text, starting with the heading as its first line, with no preamble.
+
+Trial context:
+{context_str}
+
+Sections, in order:
+
+{listing}"""
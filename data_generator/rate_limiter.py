@@ -0,0 +1,88 @@
+"""Client-side request/token budget for the OpenAI API.
+
+Token-bucket limiter after the OpenAI cookbook's
+``api_request_parallel_processor.py``: request and token capacity refill
+continuously up to the per-minute limits, and each call waits until both
+buckets can cover it.  Pacing calls this way keeps large batches just under
+the account's RPM/TPM limits instead of running into 429s and backing off.
+
+The limiter holds no asyncio primitives (the event loop is cooperative, so
+check-and-consume between awaits is atomic), which lets one instance be
+shared by the builders even though each runs in its own ``asyncio.run``.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Token bucket over requests per minute and tokens per minute.
+
+    Either limit may be None to leave that dimension unbounded.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(
+                float(self.requests_per_minute),
+                self._requests + elapsed * self.requests_per_minute / 60,
+            )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                float(self.tokens_per_minute),
+                self._tokens + elapsed * self.tokens_per_minute / 60,
+            )
+
+    def _wait_seconds(self, tokens: int) -> float:
+        """Seconds until both buckets can cover one request of *tokens*."""
+        wait = 0.0
+        if self.requests_per_minute and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute:
+            # A request larger than the whole bucket only waits for a full one
+            needed = min(float(tokens), float(self.tokens_per_minute))
+            if self._tokens < needed:
+                wait = max(wait, (needed - self._tokens) * 60 / self.tokens_per_minute)
+        return wait
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait until one request of *tokens* fits the budget, then consume it."""
+        while True:
+            self._refill()
+            wait = self._wait_seconds(tokens)
+            if wait <= 0:
+                break
+            logger.debug("Rate limiter: waiting %.2fs for %s tokens", wait, tokens)
+            await asyncio.sleep(wait)
+        if self.requests_per_minute:
+            self._requests -= 1
+        if self.tokens_per_minute:
+            self._tokens -= tokens
+
+
+def make_rate_limiter(
+    requests_per_minute: Optional[float],
+    tokens_per_minute: Optional[float],
+) -> Optional[RateLimiter]:
+    """Return a RateLimiter, or None when neither limit is set."""
+    if not requests_per_minute and not tokens_per_minute:
+        return None
+    return RateLimiter(requests_per_minute, tokens_per_minute)
@@ -0,0 +1,64 @@
+"""Content-addressed disk cache of generated section text.
+
+A section's text is fully determined by its request (model, messages,
+reasoning effort, token limit, temperature), so completions are stored
+under the BLAKE2b hash of the serialized request kwargs:
+``<cache_dir>/<key[:2]>/<key>.txt``.  Re-running a trial, or regenerating
+a dataset while iterating on downstream code, then costs no API calls for
+sections that were already generated.  Writes go through a temp file and
+a rename, so a crash never leaves a partial entry.
+"""
+
+import hashlib
+import json
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from data_generator.config import Config
+
+
+def cache_key(api_kwargs: Dict[str, Any]) -> str:
+    """Stable hex digest of the Chat Completions request kwargs."""
+    payload = json.dumps(api_kwargs, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=32).hexdigest()
+
+
+class ResponseCache:
+    """Directory of cached completions, one text file per request hash."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.txt"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Path of the cached text for *key*, or None on a miss."""
+        path = self._path(key)
+        return path if path.exists() else None
+
+    def _tmp_path(self, key: str) -> Path:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+
+    def store_file(self, key: str, src: Path) -> None:
+        """Copy the finished section file *src* into the cache."""
+        tmp_path = self._tmp_path(key)
+        shutil.copyfile(src, tmp_path)
+        tmp_path.replace(self._path(key))
+
+    def store_text(self, key: str, text: str) -> None:
+        """Store *text* as the cached completion for *key*."""
+        tmp_path = self._tmp_path(key)
+        tmp_path.write_text(text, encoding="utf-8")
+        tmp_path.replace(self._path(key))
+
+
+def open_response_cache(config: Config) -> Optional[ResponseCache]:
+    """Cache rooted at config.cache_dir (None if caching is disabled)."""
+    if not config.cache_dir:
+        return None
+    return ResponseCache(Path(config.cache_dir).expanduser())